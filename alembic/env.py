@@ -12,7 +12,7 @@ from alembic import context
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.db.base import Base
 
 # Ensure models are imported so they are registered on Base.metadata
@@ -32,7 +32,7 @@ target_metadata = Base.metadata
 
 def get_url() -> str:
     """Get database URL from settings."""
-    return settings.postgres_url
+    return get_settings().postgres_url
 
 
 def run_migrations_offline() -> None:
@@ -0,0 +1,26 @@
+"""add timestamp server defaults
+
+Revision ID: 7c1e9b2f4d38
+Revises: 5d55ccbe0a77
+Create Date: 2026-10-15 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9b2f4d38'
+down_revision = '5d55ccbe0a77'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('users', 'created_at', server_default=sa.func.now())
+    op.alter_column('users', 'updated_at', server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    op.alter_column('users', 'updated_at', server_default=None)
+    op.alter_column('users', 'created_at', server_default=None)
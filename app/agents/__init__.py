@@ -1,3 +1,4 @@
+from .query_cache import QueryCache, invalidate_query_cache, query_cache
 from .rag_agent import RAGAgent
 
-__all__ = ["RAGAgent"]
+__all__ = ["QueryCache", "RAGAgent", "invalidate_query_cache", "query_cache"]
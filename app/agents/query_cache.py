@@ -0,0 +1,10 @@
+from app.utils.query_cache import QueryCache
+
+
+# Shared across requests so every RAGAgent instance benefits from earlier lookups
+query_cache = QueryCache(max_size=2000, ttl_seconds=300)
+
+
+def invalidate_query_cache() -> None:
+    """Purge cached retrieval results, e.g. after new documents are indexed."""
+    query_cache.invalidate()
@@ -1,44 +1,63 @@
+import asyncio
+import os
+import uuid
+import xxhash
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from typing import Annotated, List, Literal
+from langchain_core.tools import StructuredTool
+from typing import Annotated, List, Literal, NotRequired, Optional, Tuple, TypedDict
 from langchain_core.documents import Document
 from langgraph.graph import StateGraph, MessagesState, START, END, add_messages
 from langgraph.graph.message import BaseMessage
+from langchain_core.messages import AIMessage
+from langgraph.config import get_stream_writer
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
 from pydantic import BaseModel, Field
 from IPython.display import Image, display
 from langgraph.graph import MessagesState
+from app.agents.query_cache import query_cache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.utils.query_cache import QueryCache
 
-GRADE_PROMPT = (
-    "You are a grader assessing relevance of a retrieved document to a user question. \n "
-    "Here is the retrieved document: \n\n {context} \n\n"
-    "Here is the user question: {question} \n"
-    "If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n"
-    "Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question."
-)
-
-REWRITE_PROMPT = (
-    "Look at the input and try to reason about the underlying semantic intent / meaning.\n"
-    "Here is the initial question:"
-    "\n ------- \n"
-    "{question}"
-    "\n ------- \n"
-    "Formulate an improved question:"
-)
+logger = get_logger(__name__)
 
-GENERATE_PROMPT = (
+# Static instructions go in the system message so providers can cache the prompt prefix
+DECIDE_SYSTEM_PROMPT = (
     "You are an assistant for question-answering tasks. "
-    "Use the following pieces of retrieved context to answer the question. "
+    "You are given a user question and context retrieved from a vector store.\n"
+    "- If the context contains keyword(s) or semantic meaning related to the question, "
+    "set decision to 'answer' and answer the question using the context. "
     "If you don't know the answer, just say that you don't know. "
     "Use three sentences maximum and keep the answer concise.\n"
+    "- If the context is not relevant and rewrites remain, set decision to 'rewrite' "
+    "and put an improved question that captures the underlying semantic intent in rewritten_query.\n"
+    "- Otherwise set decision to 'give_up'."
+)
+
+DECIDE_USER_PROMPT = (
+    "Rewrites remaining: {rewrites_left}\n"
     "Question: {question} \n"
     "Context: {context}"
 )
 
 MAX_REWRITES = 2
 
+RAG_GRAPH_PNG_PATH = "rag_graph.png"
+
+NO_ANSWER_MESSAGE = (
+    "I couldn't find relevant context to answer this. "
+    "Please try rephrasing or provide more details."
+)
+
+# The original question plus up to three rephrasings are retrieved concurrently
+MAX_RETRIEVAL_QUERIES = 4
+
+# Questions outside this range are searched as-is without asking the LLM for rephrasings
+MIN_EXPANSION_WORDS = 4
+MAX_EXPANSION_CHARS = 500
+
 SYSTEM_TOOL_INSTRUCTION = (
     "You are part of a retrieval-augmented system. "
     "Before answering, you MUST call the `retrieve_documents` tool with the user's question "
@@ -46,90 +65,226 @@ SYSTEM_TOOL_INSTRUCTION = (
 )
 
 
-class GradeDocuments(BaseModel):
-    binary_score: str = Field(
-        description="Relevance score: 'yes' if relevant, or 'no' if not relevant"
+class RetrieveDocumentsInput(BaseModel):
+    queries: List[str] = Field(
+        description=(
+            "The user's question followed by up to three alternative phrasings of it. "
+            "All queries are searched against the vector store in parallel."
+        )
+    )
+
+
+class GradeAndAnswer(BaseModel):
+    decision: Literal["answer", "rewrite", "give_up"] = Field(
+        description="'answer' if the context is relevant, 'rewrite' to retry with a better question, or 'give_up'"
+    )
+    answer: Optional[str] = Field(
+        default=None, description="Answer to the question when decision is 'answer'"
+    )
+    rewritten_query: Optional[str] = Field(
+        default=None, description="Improved question when decision is 'rewrite'"
     )
 
 
-class RAGAgentState(BaseModel):
+class RAGAgentState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
-    rewrites: int = 0
+    rewrites: NotRequired[int]
+    decision: NotRequired[Optional[str]]
 
 
 class RAGAgent:
-    def __init__(self, vector_store_retriever: VectorStoreRetriever, llm: ChatOpenAI):
+    def __init__(
+        self,
+        vector_store_retriever: VectorStoreRetriever,
+        llm: ChatOpenAI,
+        embedding_model: str,
+    ):
         self.vector_store_retriever = vector_store_retriever
         self.llm = llm
-        self.graph = StateGraph(MessagesState)
-
-    @tool(
-        response_format="content_and_artifact",
-        description="Retrieve documents from the vector store given a natural language query.",
-    )
-    def retrieve_documents(self, query: str) -> str:
-        docs = self.vector_store_retriever.get_relevant_documents(query)
-        print(docs)
-        context = "\n\n".join(
-            d.page_content for d in docs if getattr(d, "page_content", None)
+        self.graph = StateGraph(RAGAgentState)
+        # A JSON-schema dict (not the model) makes the parser yield partial objects
+        self._decide_llm = self.llm.with_structured_output(
+            GradeAndAnswer.model_json_schema(), method="json_schema"
+        )
+        self._cache = query_cache
+        # Reformulations depend only on the question, not on the indexed documents
+        self._expansion_cache = QueryCache(max_size=1024, ttl_seconds=900)
+        # Concurrent requests for the same question share a single LLM call
+        self._inflight_expansions: dict[str, asyncio.Task] = {}
+        # Retrievers with different embedding models or search settings return
+        # different documents, so they must not share cache entries
+        self._cache_namespace = (
+            f"{embedding_model}:"
+            f"{vector_store_retriever.search_type}:"
+            f"{sorted(vector_store_retriever.search_kwargs.items())}"
+        )
+        self.retrieve_documents = StructuredTool.from_function(
+            coroutine=self._retrieve,
+            name="retrieve_documents",
+            description="Retrieve documents from the vector store given one or more natural language queries.",
+            args_schema=RetrieveDocumentsInput,
+            response_format="content_and_artifact",
         )
-        return context
 
-    def generate_query_or_respond(self, state: RAGAgentState) -> RAGAgentState:
-        response = self.llm.bind_tools([self.retrieve_documents]).invoke(state.messages)
-        print(response)
-        return {"messages": [response]}
+    async def _retrieve(self, queries: List[str]) -> Tuple[str, List[Document]]:
+        # Drop blanks and duplicates while keeping the caller's ordering
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))
+        queries = queries[:MAX_RETRIEVAL_QUERIES]
 
-    def grade_documents(
-        self, state: RAGAgentState
-    ) -> Literal["generate_answer", "rewrite_question", "no_answer"]:
-        question = state.messages[0].content
-        context = state.messages[-1].content
-
-        # If retrieval returned nothing, bail out or try limited rewrites
-        if not str(context).strip():
-            if state.rewrites >= MAX_REWRITES:
-                return "no_answer"
-            return "rewrite_question"
-
-        prompt = GRADE_PROMPT.format(question=question, context=context)
-        response = self.llm.with_structured_output(GradeDocuments).invoke(
-            [{"role": "user", "content": prompt}]
+        key = QueryCache.make_key(self._cache_namespace, *queries)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        batches = await asyncio.gather(
+            *[self.vector_store_retriever.ainvoke(input=q) for q in queries],
+            return_exceptions=True,
         )
-        score = response.binary_score
-
-        if score == "yes":
-            return "generate_answer"
-        if state.rewrites >= MAX_REWRITES:
-            return "no_answer"
-        return "rewrite_question"
-
-    def rewrite_question(self, state: RAGAgentState) -> RAGAgentState:
-        messages = state.messages
-        question = messages[0].content
-        prompt = REWRITE_PROMPT.format(question=question)
-        response = self.llm.invoke([{"role": "user", "content": prompt}])
-        return {
-            "messages": [{"role": "user", "content": response.content}],
-            "rewrites": state.rewrites + 1,
-        }
 
-    def generate_answer(self, state: RAGAgentState) -> RAGAgentState:
-        question = state.messages[0].content
-        context = state.messages[-1].content
-        prompt = GENERATE_PROMPT.format(question=question, context=context)
-        response = self.llm.invoke([{"role": "user", "content": prompt}])
-        return {"messages": [response], "rewrites": state.rewrites}
+        retrieved: List[Document] = []
+        failed = False
+        for query, batch in zip(queries, batches):
+            if isinstance(batch, BaseException):
+                logger.warning("Retrieval failed for query '%s': %s", query, batch)
+                failed = True
+                continue
+            retrieved.extend(batch)
 
-    def no_answer(self, state: RAGAgentState) -> RAGAgentState:
-        return {
-            "messages": [
+        all_docs = self._dedupe_docs(retrieved)
+
+        context = self._docs_to_context(all_docs)
+        # Partial results are not cached so a transient failure is retried next time
+        if not failed:
+            self._cache.put(key, (context, all_docs))
+        return context, all_docs
+
+    @staticmethod
+    def _dedupe_docs(docs: List[Document]) -> List[Document]:
+        """Drop empty and repeated documents, keeping first-seen order."""
+        # 64-bit xxh3 fingerprints are cheaper to hash and store than the full text
+        unique: dict[int, Document] = {}
+        for d in docs:
+            if d.page_content:
+                key = xxhash.xxh3_64_intdigest(d.page_content.encode("utf-8", "ignore"))
+                unique.setdefault(key, d)
+        return list(unique.values())
+
+    @staticmethod
+    def _docs_to_context(docs: List[Document]) -> str:
+        # join() materialises its input anyway, so a list avoids the generator overhead
+        return "\n\n".join([d.page_content for d in docs])
+
+    async def generate_query_or_respond(self, state: RAGAgentState) -> RAGAgentState:
+        # Rewrites carry earlier turns in the history, so they always go to the LLM
+        if len(state["messages"]) != 1:
+            return {"messages": [await self._expand_queries(state["messages"])]}
+
+        question = str(state["messages"][0].content).strip()
+        if (
+            len(question.split()) < MIN_EXPANSION_WORDS
+            or len(question) > MAX_EXPANSION_CHARS
+        ):
+            return {"messages": [self._direct_retrieval_call(question)]}
+
+        key = QueryCache.make_key(question)
+        cached = self._expansion_cache.get(key)
+        if cached is not None:
+            return {"messages": [cached]}
+
+        task = self._inflight_expansions.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._expand_queries(state["messages"], key))
+            self._inflight_expansions[key] = task
+            task.add_done_callback(
+                lambda _: self._inflight_expansions.pop(key, None)
+            )
+        # Shielded so one cancelled request does not cancel the call for the others
+        return {"messages": [await asyncio.shield(task)]}
+
+    async def _expand_queries(
+        self, messages: List[BaseMessage], cache_key: Optional[str] = None
+    ) -> AIMessage:
+        response = await self.llm.bind_tools([self.retrieve_documents]).ainvoke(
+            messages
+        )
+        if cache_key is not None and response.tool_calls:
+            self._expansion_cache.put(cache_key, response)
+        return response
+
+    @staticmethod
+    def _direct_retrieval_call(question: str) -> AIMessage:
+        """Build a retrieve_documents call for the question without rephrasings."""
+        return AIMessage(
+            content="",
+            tool_calls=[
                 {
-                    "role": "assistant",
-                    "content": "I couldn't find relevant context to answer this. Please try rephrasing or provide more details.",
+                    "name": "retrieve_documents",
+                    "args": {"queries": [question]},
+                    "id": f"call_{uuid.uuid4().hex}",
                 }
             ],
-            "rewrites": state.rewrites,
+        )
+
+    async def decide_and_act(self, state: RAGAgentState) -> RAGAgentState:
+        question = state["messages"][0].content
+        context = state["messages"][-1].content
+        rewrites_left = MAX_REWRITES - state.get("rewrites", 0)
+
+        # Nothing retrieved and no rewrites left: no point asking the LLM
+        if not str(context).strip() and rewrites_left <= 0:
+            return {"decision": "give_up"}
+
+        prompt = DECIDE_USER_PROMPT.format(
+            question=question, context=context, rewrites_left=rewrites_left
+        )
+        messages = [
+            {"role": "system", "content": DECIDE_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+        # Forward answer text to stream_mode="custom" consumers as it is generated
+        writer = get_stream_writer()
+        streamed = ""
+        result: dict = {}
+        async for partial in self._decide_llm.astream(messages):
+            result = partial or result
+            answer = result.get("answer") or ""
+            if result.get("decision") == "answer" and len(answer) > len(streamed):
+                writer({"answer_delta": answer[len(streamed) :]})
+                streamed = answer
+        response = GradeAndAnswer.model_validate(result)
+
+        if response.decision == "answer" and response.answer:
+            return {
+                "messages": [{"role": "assistant", "content": response.answer}],
+                "decision": "answer",
+            }
+        if (
+            response.decision == "rewrite"
+            and response.rewritten_query
+            and rewrites_left > 0
+        ):
+            return {
+                "messages": [{"role": "user", "content": response.rewritten_query}],
+                "rewrites": state.get("rewrites", 0) + 1,
+                "decision": "rewrite",
+            }
+        return {"decision": "give_up"}
+
+    def route_decision(
+        self, state: RAGAgentState
+    ) -> Literal["generate_query_or_respond", "no_answer", "__end__"]:
+        if state.get("decision") == "answer":
+            return END
+        if state.get("decision") == "rewrite":
+            return "generate_query_or_respond"
+        return "no_answer"
+
+    async def no_answer(self, state: RAGAgentState) -> RAGAgentState:
+        get_stream_writer()({"answer_delta": NO_ANSWER_MESSAGE})
+        return {
+            "messages": [{"role": "assistant", "content": NO_ANSWER_MESSAGE}],
+            "rewrites": state.get("rewrites", 0),
         }
 
     def get_graph(
@@ -137,23 +292,30 @@ class RAGAgent:
     ) -> CompiledStateGraph[RAGAgentState, None, RAGAgentState, RAGAgentState]:
         self.graph.add_node("generate_query_or_respond", self.generate_query_or_respond)
         self.graph.add_node("retrieve", ToolNode([self.retrieve_documents]))
-        self.graph.add_node("rewrite_question", self.rewrite_question)
-        self.graph.add_node("generate_answer", self.generate_answer)
+        self.graph.add_node("decide_and_act", self.decide_and_act)
         self.graph.add_node("no_answer", self.no_answer)
 
         self.graph.add_edge(START, "generate_query_or_respond")
         self.graph.add_edge("generate_query_or_respond", "retrieve")
+        self.graph.add_edge("retrieve", "decide_and_act")
         self.graph.add_conditional_edges(
-            "retrieve",
-            self.grade_documents,
+            "decide_and_act",
+            self.route_decision,
         )
-        self.graph.add_edge("generate_answer", END)
         self.graph.add_edge("no_answer", END)
-        self.graph.add_edge("rewrite_question", "generate_query_or_respond")
 
         graph = self.graph.compile()
 
-        with open("rag_graph.png", "wb") as f:
-            f.write(graph.get_graph().draw_mermaid_png())
+        # Rendering goes through mermaid.ink, so only do it once and only on request
+        if get_settings().generate_graph_png and not os.path.exists(RAG_GRAPH_PNG_PATH):
+            self._export_graph_png(graph)
 
         return graph
+
+    def _export_graph_png(self, graph: CompiledStateGraph) -> None:
+        try:
+            png = graph.get_graph().draw_mermaid_png()
+            with open(RAG_GRAPH_PNG_PATH, "wb") as f:
+                f.write(png)
+        except Exception as e:
+            logger.warning("Could not render RAG graph diagram: %s", e)
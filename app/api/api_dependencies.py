@@ -2,7 +2,7 @@ from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.services.auth_service import AuthService
+from app.services.auth_service import auth_service
 from app.db.session import get_db
 
 security = HTTPBearer()
@@ -13,7 +13,6 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """Get current authenticated user."""
-    auth_service = AuthService()
     return await auth_service.get_current_user(db, credentials.credentials)
 
 
@@ -29,5 +28,4 @@ async def get_current_superuser(
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """Get current superuser."""
-    auth_service = AuthService()
     return await auth_service.get_current_superuser(db, credentials.credentials)
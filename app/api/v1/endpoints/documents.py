@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query
+from fastapi import APIRouter, Depends, File, Request, UploadFile, HTTPException, Query
 from typing import Annotated
 from fastapi.responses import Response
 from langchain_chroma import Chroma
+from app.agents.query_cache import invalidate_query_cache
+from app.core.config import get_settings
 from app.core.dependencies import (
     get_chroma_vector_client,
     get_chunk_service,
@@ -9,13 +11,16 @@ from app.core.dependencies import (
 )
 from app.services.chunk_service import ChunkService
 from app.services.document_service import DocumentService
-import json
+from app.services.vector_service import aadd_documents_in_batches
 
 router = APIRouter()
 
+PDF_MAGIC = b"%PDF-"
+
 
 @router.post("/upload")
 async def upload_documents(
+    request: Request,
     files: Annotated[
         list[UploadFile], File(description="Knowledge base document files")
     ],
@@ -23,14 +28,29 @@ async def upload_documents(
     document_service: DocumentService = Depends(get_document_service),
     chroma: Chroma = Depends(get_chroma_vector_client),
 ):
+    # Content-Length is only a hint, absent on chunked uploads, so the sizes
+    # Starlette actually received are checked too
+    content_length = request.headers.get("content-length", "")
+    max_upload_bytes = get_settings().max_upload_bytes
+    if content_length.isdigit() and int(content_length) > max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+    if sum(file.size or 0 for file in files) > max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+
+    # Content type is client-controlled, so also check the PDF signature
     for file in files:
         if file.content_type != "application/pdf":
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        header = await file.read(len(PDF_MAGIC))
+        await file.seek(0)
+        if header != PDF_MAGIC:
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
     text = await document_service.extract_pdf(files)
     chunks = await chunk_service.semantic_chunk(
         text, breakpoint_threshold_type="percentile", breakpoint_threshold_amount=90
     )
 
-    chroma.add_documents(chunks)
+    await aadd_documents_in_batches(chroma, chunks)
+    invalidate_query_cache()
     return Response(content=text, status_code=200)
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.db.mongodb import get_mongo_database
 from app.db.session import get_db
 from app.schemas.response import HealthCheckResponse
@@ -49,7 +49,7 @@ async def health_check(db: AsyncSession | None = Depends(get_db_optional)):
         status="healthy",
         timestamp=datetime.now(timezone.utc),
         version="1.0.0",
-        environment=settings.environment,
+        environment=get_settings().environment,
         database_status=database_status,
     )
 
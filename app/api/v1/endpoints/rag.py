@@ -1,11 +1,8 @@
 from fastapi import APIRouter, Depends
-from langchain_openai import ChatOpenAI
-from app.agents.rag_agent import RAGAgent
-from app.core.dependencies import (
-    get_openai_llm_client,
-    get_vector_store_retriever,
-)
-from langchain_core.vectorstores import VectorStoreRetriever
+from fastapi.responses import StreamingResponse
+from langgraph.graph.state import CompiledStateGraph
+from app.agents.query_cache import query_cache
+from app.core.dependencies import get_rag_graph
 
 router = APIRouter()
 
@@ -13,11 +10,18 @@ router = APIRouter()
 @router.post("/rag")
 async def rag(
     query: str,
-    retriever: VectorStoreRetriever = Depends(get_vector_store_retriever),
-    llm: ChatOpenAI = Depends(get_openai_llm_client),
+    graph: CompiledStateGraph = Depends(get_rag_graph),
 ):
-    rag_agent = RAGAgent(retriever, llm)
-    graph = rag_agent.get_graph()
-    result = graph.invoke({"messages": [{"role": "user", "content": query}]})
+    async def stream_answer():
+        async for event in graph.astream(
+            {"messages": [{"role": "user", "content": query}]}, stream_mode="custom"
+        ):
+            yield event["answer_delta"]
 
-    return result.get("messages", [])[-1].content
+    return StreamingResponse(stream_answer(), media_type="text/plain; charset=utf-8")
+
+
+@router.get("/cache/stats")
+async def rag_cache_stats():
+    """Retrieval cache statistics."""
+    return query_cache.stats()
@@ -1,13 +1,13 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.api_dependencies import get_current_superuser, get_current_user
 from app.db.session import get_db
 from app.models.user import User as UserModel
-from app.schemas.user import User, UserUpdate
-from app.services.user_service import UserService
+from app.schemas.user import USER_LIST_ADAPTER, User, UserUpdate
+from app.services.user_service import user_service
 
 router = APIRouter()
 
@@ -20,9 +20,12 @@ async def get_users(
     current_user: UserModel = Depends(get_current_superuser),
 ):
     """Get list of users (admin only)."""
-    user_service = UserService()
     users = await user_service.get_users(db, skip=skip, limit=limit)
-    return users
+    # Skips FastAPI's validate -> dict -> JSON round trip for the whole list
+    return Response(
+        content=USER_LIST_ADAPTER.dump_json(USER_LIST_ADAPTER.validate_python(users)),
+        media_type="application/json",
+    )
 
 
 @router.get("/{user_id}", response_model=User)
@@ -32,7 +35,6 @@ async def get_user(
     current_user: UserModel = Depends(get_current_user),
 ):
     """Get user by ID."""
-    user_service = UserService()
     return await user_service.get_user(db, user_id)
 
 
@@ -50,7 +52,6 @@ async def update_user(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
 
-    user_service = UserService()
     return await user_service.update_user(db, user_id, user_in)
 
 
@@ -61,7 +62,6 @@ async def delete_user(
     current_user: UserModel = Depends(get_current_superuser),
 ):
     """Delete user (admin only)."""
-    user_service = UserService()
     await user_service.delete_user(db, user_id)
     return {"message": "User deleted successfully"}
 
@@ -73,7 +73,6 @@ async def activate_user(
     current_user: UserModel = Depends(get_current_superuser),
 ):
     """Activate user (admin only)."""
-    user_service = UserService()
     user = await user_service.activate_user(db, user_id)
     return {"message": f"User {user.username} activated successfully"}
 
@@ -85,6 +84,5 @@ async def deactivate_user(
     current_user: UserModel = Depends(get_current_superuser),
 ):
     """Deactivate user (admin only)."""
-    user_service = UserService()
     user = await user_service.deactivate_user(db, user_id)
     return {"message": f"User {user.username} deactivated successfully"}
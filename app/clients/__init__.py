@@ -1,50 +1,67 @@
+from functools import lru_cache
 from typing import Optional
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_openai import ChatOpenAI
 from app.clients.embeddings import OpenAIEmbeddingClient
+from app.clients.http_client import get_async_http_client, get_http_client
 from app.clients.llm import OpenAiLLMClient
-from app.core.config import settings
+from app.core.config import get_settings
 from app.clients.vector import ChromaClient
 from app.clients.constants import (
+    EMBEDDING_CHUNK_SIZE,
+    OPENAI_MAX_RETRIES,
     OPENAI_MODEL_OPTIONS,
     OPENAI_EMBEDDING_MODEL_OPTIONS,
 )
 
 
 class ClientFactory:
-    """Client factory for creating clients."""
+    """Client factory for creating clients.
+
+    OpenAI clients are memoized per (model, kwargs) so callers share one
+    instance and its connection pool; any extra kwargs must be hashable.
+    """
 
     @staticmethod
+    @lru_cache(maxsize=16)
     def get_openai_llm_client(
         model: Optional[OPENAI_MODEL_OPTIONS] = "gpt-4o-mini", **kwargs
     ) -> ChatOpenAI:
         try:
-            if settings.openai_api_key is None:
+            if get_settings().openai_api_key is None:
                 raise ValueError("OpenAI API key is not set")
 
+            kwargs.setdefault("http_client", get_http_client())
+            kwargs.setdefault("http_async_client", get_async_http_client())
             return OpenAiLLMClient(
-                api_key=settings.openai_api_key, model=model, **kwargs
+                api_key=get_settings().openai_api_key, model=model, **kwargs
             ).get_client()
         except Exception as e:
             raise ValueError(f"Error creating OpenAI LLM client: {e}")
 
     @staticmethod
+    @lru_cache(maxsize=16)
     def get_openai_embedding_client(
         model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = "text-embedding-3-large",
         **kwargs,
-    ) -> OpenAIEmbeddings:
+    ) -> Embeddings:
         try:
-            if settings.openai_api_key is None:
+            if get_settings().openai_api_key is None:
                 raise ValueError("OpenAI API key is not set")
 
+            kwargs.setdefault("chunk_size", EMBEDDING_CHUNK_SIZE)
+            kwargs.setdefault("max_retries", OPENAI_MAX_RETRIES)
+            kwargs.setdefault("http_client", get_http_client())
+            kwargs.setdefault("http_async_client", get_async_http_client())
             return OpenAIEmbeddingClient(
-                api_key=settings.openai_api_key, model=model, **kwargs
+                api_key=get_settings().openai_api_key, model=model, **kwargs
             ).get_client()
         except Exception as e:
             raise ValueError(f"Error creating OpenAI embedding client: {e}")
 
     @staticmethod
     def get_chroma_vector_client(
-        embeddings: OpenAIEmbeddings, **kwargs
+        embeddings: Embeddings, **kwargs
     ) -> ChromaClient:
         try:
             if embeddings is None:
@@ -19,6 +19,9 @@ EMBEDDING_PROVIDERS = Literal["openai", "google"]
 # Vector Store Providers
 VECTOR_PROVIDERS = Literal["chroma"]
 
+# Retriever Profiles (latency vs. recall trade-off)
+RETRIEVER_PROFILE_OPTIONS = Literal["fast", "balanced", "recall_max"]
+
 # =============================================================================
 # MODEL OPTIONS
 # =============================================================================
@@ -52,6 +55,74 @@ GOOGLE_EMBEDDING_MODEL_OPTIONS = Literal[
     "text-multilingual-embedding-002",
 ]
 
+# Hashed lookup tables for the validators below
+_OPENAI_LLM_MODELS = frozenset(OPENAI_MODEL_OPTIONS.__args__)
+_GOOGLE_LLM_MODELS = frozenset(GOOGLE_MODEL_OPTIONS.__args__)
+_OPENAI_EMBEDDING_MODELS = frozenset(OPENAI_EMBEDDING_MODEL_OPTIONS.__args__)
+_GOOGLE_EMBEDDING_MODELS = frozenset(GOOGLE_EMBEDDING_MODEL_OPTIONS.__args__)
+_EMPTY: frozenset = frozenset()
+
+_LLM_MODELS_BY_PROVIDER: Dict[str, frozenset] = {
+    "openai": _OPENAI_LLM_MODELS,
+    "google": _GOOGLE_LLM_MODELS,
+}
+_EMBEDDING_MODELS_BY_PROVIDER: Dict[str, frozenset] = {
+    "openai": _OPENAI_EMBEDDING_MODELS,
+    "google": _GOOGLE_EMBEDDING_MODELS,
+}
+
+# =============================================================================
+# CLIENT DEFAULTS
+# =============================================================================
+
+# Models and retriever profile used when a request does not choose one
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-3-large"
+DEFAULT_RETRIEVER_PROFILE = "balanced"
+
+# Texts sent per embeddings API request
+EMBEDDING_CHUNK_SIZE = 1000
+
+# On-disk cache of document embeddings, keyed by model and text hash
+EMBEDDING_CACHE_DIR = ".cache/embeddings"
+
+# Retries for transient OpenAI API failures
+OPENAI_MAX_RETRIES = 3
+
+# Connection pool shared by the OpenAI LLM and embedding clients
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 100
+HTTP_TIMEOUT = 60.0
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_TRANSPORT_RETRIES = 2
+
+# Documents embedded and inserted per concurrent ingestion batch
+INGEST_BATCH_SIZE = 256
+
+# Documents returned per retriever query
+RETRIEVER_K = 4
+
+# as_retriever() arguments for each retriever profile
+RETRIEVER_PROFILES: Dict[str, dict] = {
+    "fast": {"search_type": "similarity", "search_kwargs": {"k": RETRIEVER_K}},
+    "balanced": {
+        "search_type": "mmr",
+        "search_kwargs": {
+            "k": RETRIEVER_K,
+            "fetch_k": RETRIEVER_K * 3,
+            "lambda_mult": 0.5,
+        },
+    },
+    "recall_max": {
+        "search_type": "mmr",
+        "search_kwargs": {
+            "k": RETRIEVER_K * 2,
+            "fetch_k": RETRIEVER_K * 10,
+            "lambda_mult": 0.3,
+        },
+    },
+}
+
 
 # =============================================================================
 # VALIDATION FUNCTIONS
@@ -68,11 +139,7 @@ def is_valid_llm_model(model: str, provider: LLM_PROVIDERS) -> bool:
     Returns:
         True if model is valid for the provider, False otherwise
     """
-    if provider == "openai":
-        return model in OPENAI_MODEL_OPTIONS.__args__
-    elif provider == "google":
-        return model in GOOGLE_MODEL_OPTIONS.__args__
-    return False
+    return model in _LLM_MODELS_BY_PROVIDER.get(provider, _EMPTY)
 
 
 def is_valid_embedding_model(model: str, provider: EMBEDDING_PROVIDERS) -> bool:
@@ -85,11 +152,7 @@ def is_valid_embedding_model(model: str, provider: EMBEDDING_PROVIDERS) -> bool:
     Returns:
         True if model is valid for the provider, False otherwise
     """
-    if provider == "openai":
-        return model in OPENAI_EMBEDDING_MODEL_OPTIONS.__args__
-    elif provider == "google":
-        return model in GOOGLE_EMBEDDING_MODEL_OPTIONS.__args__
-    return False
+    return model in _EMBEDDING_MODELS_BY_PROVIDER.get(provider, _EMPTY)
 
 
 # =============================================================================
@@ -97,8 +160,16 @@ def is_valid_embedding_model(model: str, provider: EMBEDDING_PROVIDERS) -> bool:
 # =============================================================================
 
 # Export all model options for easy importing
-ALL_LLM_MODELS = OPENAI_MODEL_OPTIONS.__args__ + GOOGLE_MODEL_OPTIONS.__args__
-ALL_EMBEDDING_MODELS = (
+ALL_LLM_MODELS: frozenset[str] = _OPENAI_LLM_MODELS | _GOOGLE_LLM_MODELS
+ALL_EMBEDDING_MODELS: frozenset[str] = (
+    _OPENAI_EMBEDDING_MODELS | _GOOGLE_EMBEDDING_MODELS
+)
+
+# Ordered forms for consumers that list models (e.g. docs or UI choices)
+ALL_LLM_MODELS_TUPLE: tuple[str, ...] = (
+    OPENAI_MODEL_OPTIONS.__args__ + GOOGLE_MODEL_OPTIONS.__args__
+)
+ALL_EMBEDDING_MODELS_TUPLE: tuple[str, ...] = (
     OPENAI_EMBEDDING_MODEL_OPTIONS.__args__ + GOOGLE_EMBEDDING_MODEL_OPTIONS.__args__
 )
 
@@ -113,10 +184,28 @@ __all__ = [
     "LLM_PROVIDERS",
     "EMBEDDING_PROVIDERS",
     "VECTOR_PROVIDERS",
+    "RETRIEVER_PROFILE_OPTIONS",
+    # Client Defaults
+    "DEFAULT_OPENAI_MODEL",
+    "DEFAULT_OPENAI_EMBEDDING_MODEL",
+    "DEFAULT_RETRIEVER_PROFILE",
+    "EMBEDDING_CHUNK_SIZE",
+    "EMBEDDING_CACHE_DIR",
+    "OPENAI_MAX_RETRIES",
+    "HTTP_MAX_CONNECTIONS",
+    "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    "HTTP_TIMEOUT",
+    "HTTP_CONNECT_TIMEOUT",
+    "HTTP_TRANSPORT_RETRIES",
+    "INGEST_BATCH_SIZE",
+    "RETRIEVER_K",
+    "RETRIEVER_PROFILES",
     # Validation Functions
     "is_valid_llm_model",
     "is_valid_embedding_model",
     # Combined Lists
     "ALL_LLM_MODELS",
     "ALL_EMBEDDING_MODELS",
+    "ALL_LLM_MODELS_TUPLE",
+    "ALL_EMBEDDING_MODELS_TUPLE",
 ]
@@ -1,22 +1,36 @@
-from typing import Literal
+from typing import Literal, Optional
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from app.clients.base_client import BaseClient
-from app.clients.constants import OPENAI_EMBEDDING_MODEL_OPTIONS
+from app.clients.constants import EMBEDDING_CACHE_DIR, OPENAI_EMBEDDING_MODEL_OPTIONS
 
 
-class OpenAIEmbeddingClient(BaseClient[OpenAIEmbeddings]):
+class OpenAIEmbeddingClient(BaseClient[Embeddings]):
     """OpenAI embedding client."""
 
     def __init__(
         self,
         api_key: str,
         model: OPENAI_EMBEDDING_MODEL_OPTIONS = "text-embedding-3-large",
+        cache_dir: Optional[str] = EMBEDDING_CACHE_DIR,
         **kwargs,
     ):
         super().__init__()
-        self.client: OpenAIEmbeddings = OpenAIEmbeddings(
-            api_key=api_key, model=model, **kwargs
+        embeddings = OpenAIEmbeddings(api_key=api_key, model=model, **kwargs)
+        # Texts seen before (repeated headers, re-uploaded files) skip the API call;
+        # the model namespace keeps vectors from different models apart
+        self.client: Embeddings = (
+            CacheBackedEmbeddings.from_bytes_store(
+                embeddings,
+                LocalFileStore(cache_dir),
+                namespace=model,
+                key_encoder="blake2b",
+            )
+            if cache_dir
+            else embeddings
         )
 
-    def get_client(self) -> OpenAIEmbeddings:
+    def get_client(self) -> Embeddings:
         return self.client
@@ -0,0 +1,49 @@
+from functools import lru_cache
+
+import httpx
+
+from app.clients.constants import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+    HTTP_TRANSPORT_RETRIES,
+)
+
+_LIMITS = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+_TIMEOUT = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Shared HTTP/2 client for synchronous provider SDK calls."""
+    return httpx.Client(
+        transport=httpx.HTTPTransport(
+            http2=True, limits=_LIMITS, retries=HTTP_TRANSPORT_RETRIES
+        ),
+        timeout=_TIMEOUT,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared HTTP/2 client for asynchronous provider SDK calls."""
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            http2=True, limits=_LIMITS, retries=HTTP_TRANSPORT_RETRIES
+        ),
+        timeout=_TIMEOUT,
+    )
+
+
+async def close_http_clients() -> None:
+    """Close the shared HTTP clients, releasing their pooled connections."""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+    get_async_http_client.cache_clear()
+    get_http_client.cache_clear()
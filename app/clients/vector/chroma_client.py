@@ -1,8 +1,13 @@
-from typing import Literal, Optional, Any
+from typing import Optional, Any
+from chromadb.config import Settings
 from langchain_chroma import Chroma
 from langchain_core.vectorstores import VectorStoreRetriever
 from app.clients.base_client import BaseClient
-from app.core.config import settings
+from app.clients.constants import RETRIEVER_PROFILE_OPTIONS, RETRIEVER_PROFILES
+from app.core.config import get_settings
+
+# Telemetry would add an outbound call alongside client operations
+CHROMA_CLIENT_SETTINGS = Settings(anonymized_telemetry=False)
 
 
 class ChromaClient(BaseClient[Chroma]):
@@ -16,12 +21,14 @@ class ChromaClient(BaseClient[Chroma]):
         **kwargs,
     ):
         super().__init__()
+        settings = get_settings()
         self.client: Chroma = Chroma(
             collection_name=collection_name,
             embedding_function=embeddings,
             chroma_cloud_api_key=settings.chroma_api_key,
             tenant=settings.chroma_tenant,
             database=settings.chroma_database,
+            client_settings=CHROMA_CLIENT_SETTINGS,
             **kwargs,
         )
 
@@ -29,6 +36,11 @@ class ChromaClient(BaseClient[Chroma]):
         return self.client
 
     def get_vector_store_retriever(
-        self, k: int = 4, search_type: Literal["mmr", "similarity"] = "mmr"
+        self, profile: RETRIEVER_PROFILE_OPTIONS = "balanced"
     ) -> VectorStoreRetriever:
-        return self.client.as_retriever(search_type=search_type, k=k)
+        """Build a retriever from a fixed search profile."""
+        profile_config = RETRIEVER_PROFILES[profile]
+        return self.client.as_retriever(
+            search_type=profile_config["search_type"],
+            search_kwargs=dict(profile_config["search_kwargs"]),
+        )
@@ -1,3 +1,6 @@
+import json
+from functools import cached_property, lru_cache
+
 from pydantic import ConfigDict, field_validator
 from pydantic_settings import BaseSettings
 
@@ -9,17 +12,25 @@ class Settings(BaseSettings):
     app_name: str = "FastAPI AI API"
     debug: bool = False
     environment: str = "development"
+    # Render the RAG graph diagram via mermaid.ink (an outbound network call)
+    generate_graph_png: bool = False
 
     # LLM
     openai_api_key: str = ""
     google_gemini_api_key: str = ""
     llama_api_key: str = ""
+    # Shared limits for document post-processing LLM calls
+    llm_max_concurrency: int = 16
+    llm_tokens_per_minute: int = 200_000
 
     # API
     api_v1_prefix: str = "/api/v1"
     secret_key: str = "your-secret-key-change-in-production"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    # Reject logins for unknown usernames/emails from an in-process Bloom filter;
+    # with several workers, a user registered elsewhere is unknown until a refresh
+    login_user_filter: bool = False
 
     # Database - PostgreSQL
     postgres_server: str = "localhost"
@@ -31,12 +42,22 @@ class Settings(BaseSettings):
     # Database - MongoDB
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_database: str = "fastapi_mongo"
+    mongodb_max_pool_size: int = 50
+    mongodb_min_pool_size: int = 5
+    mongodb_max_idle_time_ms: int = 60_000
+    mongodb_server_selection_timeout_ms: int = 3_000
+    mongodb_compressors: str = "zstd,zlib"
 
     # Database - Chroma
     chroma_api_key: str = ""
     chroma_tenant: str = ""
     chroma_database: str = ""
 
+    # Uploads
+    max_upload_bytes: int = 50 * 1024 * 1024
+    # Worker processes for PDF parsing; 0 uses one per CPU
+    pdf_parse_workers: int = 0
+
     # Redis (for caching/sessions)
     redis_url: str = "redis://localhost:6379"
 
@@ -48,21 +69,18 @@ class Settings(BaseSettings):
     def parse_cors_origins(cls, v):
         """Parse CORS origins from string or list."""
         if isinstance(v, str):
-            # Handle both comma-separated strings and JSON strings
-            if v.startswith("[") and v.endswith("]"):
-                import json
-
-                try:
-                    return json.loads(v)
-                except json.JSONDecodeError:
-                    pass
-            return [origin.strip() for origin in v.split(",")]
+            # Handle both JSON strings and comma-separated strings
+            try:
+                parsed = json.loads(v)
+            except json.JSONDecodeError:
+                return [origin.strip() for origin in v.split(",")]
+            return parsed if isinstance(parsed, list) else [str(parsed)]
         return v
 
     # Security
     algorithm: str = "HS256"
 
-    @property
+    @cached_property
     def postgres_url(self) -> str:
         """Construct PostgreSQL connection URL."""
         return (
@@ -71,7 +89,7 @@ class Settings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
-    @property
+    @cached_property
     def mongodb_connection_url(self) -> str:
         """Construct MongoDB connection URL."""
         return f"{self.mongodb_url}/{self.mongodb_database}"
@@ -82,5 +100,14 @@ class Settings(BaseSettings):
     )
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the application settings, loading them on first use."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep `from app.core.config import settings` working without eager loading
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,53 +1,157 @@
-from fastapi import Depends, Query
+from functools import lru_cache
+from fastapi import Query
 from langchain_chroma import Chroma
 from langchain_core.vectorstores import VectorStoreRetriever
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_openai import ChatOpenAI
+from langgraph.graph.state import CompiledStateGraph
+from app.agents.rag_agent import RAGAgent
 from app.clients import ClientFactory
-from app.clients.constants import OPENAI_MODEL_OPTIONS, OPENAI_EMBEDDING_MODEL_OPTIONS
+from app.clients.http_client import close_http_clients
+from app.clients.vector import ChromaClient
+from app.clients.constants import (
+    DEFAULT_OPENAI_EMBEDDING_MODEL,
+    DEFAULT_OPENAI_MODEL,
+    DEFAULT_RETRIEVER_PROFILE,
+    OPENAI_MODEL_OPTIONS,
+    OPENAI_EMBEDDING_MODEL_OPTIONS,
+    RETRIEVER_PROFILE_OPTIONS,
+)
 from typing import Optional
 
 from app.services.chunk_service import ChunkService
 from app.services.document_service import DocumentService
 
 
+# ClientFactory memoizes the OpenAI clients per model; the Chroma client, services
+# and compiled graph built on top of them are cached here the same way.
+@lru_cache(maxsize=None)
+def _get_chroma_client(embedding_model: str) -> ChromaClient:
+    return ClientFactory.get_chroma_vector_client(
+        embeddings=ClientFactory.get_openai_embedding_client(model=embedding_model)
+    )
+
+
+@lru_cache(maxsize=None)
+def _build_rag_graph(
+    model: str, embedding_model: str, profile: str
+) -> CompiledStateGraph:
+    """Compile the RAG graph once per (model, embedding model, profile)."""
+    retriever = _get_chroma_client(embedding_model).get_vector_store_retriever(
+        profile=profile
+    )
+    llm = ClientFactory.get_openai_llm_client(model=model)
+    return RAGAgent(retriever, llm, embedding_model).get_graph()
+
+
+@lru_cache(maxsize=None)
+def _get_chunk_service(model: str, embedding_model: str) -> ChunkService:
+    return ChunkService(
+        embeddings=ClientFactory.get_openai_embedding_client(model=embedding_model),
+        llm=ClientFactory.get_openai_llm_client(model=model),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_document_service(model: str) -> DocumentService:
+    return DocumentService(llm=ClientFactory.get_openai_llm_client(model=model))
+
+
+async def close_clients() -> None:
+    """Close the shared HTTP clients and drop every client memoized on top of them."""
+    # Cached LLM, embedding and Chroma clients hold the HTTP clients being closed;
+    # left in place, a later lifespan in the same process would reuse them
+    for cached in (
+        _get_document_service,
+        _get_chunk_service,
+        _build_rag_graph,
+        _get_chroma_client,
+        ClientFactory.get_openai_llm_client,
+        ClientFactory.get_openai_embedding_client,
+    ):
+        cached.cache_clear()
+    await close_http_clients()
+
+
+def warm_up_clients() -> None:
+    """Build the default clients and RAG graph ahead of the first request."""
+    _build_rag_graph(
+        DEFAULT_OPENAI_MODEL, DEFAULT_OPENAI_EMBEDDING_MODEL, DEFAULT_RETRIEVER_PROFILE
+    )
+
+
 async def get_openai_embedding_client(
     embedding_model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = Query(
-        default="text-embedding-3-large", description="OpenAI embedding model to use"
+        default=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        description="OpenAI embedding model to use",
     ),
-) -> OpenAIEmbeddings:
+) -> Embeddings:
     return ClientFactory.get_openai_embedding_client(model=embedding_model)
 
 
 async def get_openai_llm_client(
     model: Optional[OPENAI_MODEL_OPTIONS] = Query(
-        default="gpt-4o-mini", description="OpenAI LLM model to use"
+        default=DEFAULT_OPENAI_MODEL, description="OpenAI LLM model to use"
     ),
 ) -> ChatOpenAI:
     return ClientFactory.get_openai_llm_client(model=model)
 
 
 async def get_chroma_vector_client(
-    embeddings: OpenAIEmbeddings = Depends(get_openai_embedding_client),
+    embedding_model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        description="OpenAI embedding model to use",
+    ),
 ) -> Chroma:
-    return ClientFactory.get_chroma_vector_client(embeddings=embeddings).get_client()
+    return _get_chroma_client(embedding_model).get_client()
 
 
 async def get_vector_store_retriever(
-    embeddings: OpenAIEmbeddings = Depends(get_openai_embedding_client),
+    embedding_model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        description="OpenAI embedding model to use",
+    ),
+    profile: RETRIEVER_PROFILE_OPTIONS = Query(
+        default=DEFAULT_RETRIEVER_PROFILE,
+        description="Retriever latency/recall profile",
+    ),
 ) -> VectorStoreRetriever:
-    return ClientFactory.get_chroma_vector_client(
-        embeddings=embeddings
-    ).get_vector_store_retriever()
+    return _get_chroma_client(embedding_model).get_vector_store_retriever(
+        profile=profile
+    )
 
 
 async def get_chunk_service(
-    embeddings: OpenAIEmbeddings = Depends(get_openai_embedding_client),
-    llm: ChatOpenAI = Depends(get_openai_llm_client),
+    model: Optional[OPENAI_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_MODEL, description="OpenAI LLM model to use"
+    ),
+    embedding_model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        description="OpenAI embedding model to use",
+    ),
 ) -> ChunkService:
-    return ChunkService(embeddings=embeddings, llm=llm)
+    return _get_chunk_service(model, embedding_model)
 
 
 async def get_document_service(
-    llm: ChatOpenAI = Depends(get_openai_llm_client),
+    model: Optional[OPENAI_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_MODEL, description="OpenAI LLM model to use"
+    ),
 ) -> DocumentService:
-    return DocumentService(llm=llm)
+    return _get_document_service(model)
+
+
+async def get_rag_graph(
+    model: Optional[OPENAI_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_MODEL, description="OpenAI LLM model to use"
+    ),
+    embedding_model: Optional[OPENAI_EMBEDDING_MODEL_OPTIONS] = Query(
+        default=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        description="OpenAI embedding model to use",
+    ),
+    profile: RETRIEVER_PROFILE_OPTIONS = Query(
+        default=DEFAULT_RETRIEVER_PROFILE,
+        description="Retriever latency/recall profile",
+    ),
+) -> CompiledStateGraph:
+    return _build_rag_graph(model, embedding_model, profile)
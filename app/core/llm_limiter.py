@@ -0,0 +1,75 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.core.config import get_settings
+
+
+class TokenBucket:
+    """Tokens-per-minute budget that refills continuously."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self._rate = tokens_per_minute / 60
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until the budget covers the tokens, then spend them."""
+        # A call larger than the whole budget waits for a full bucket, not forever
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= tokens
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Charge or refund the gap between the estimate and real usage."""
+        self._refill()
+        # Going negative makes the next callers wait off an underestimate
+        self._tokens = min(
+            self.capacity, self._tokens + estimated_tokens - actual_tokens
+        )
+
+
+class LLMUsage:
+    """Filled in by the caller with the tokens the call actually used."""
+
+    __slots__ = ("total_tokens",)
+
+    def __init__(self) -> None:
+        self.total_tokens: int | None = None
+
+
+@lru_cache(maxsize=1)
+def _limits() -> tuple[asyncio.Semaphore, TokenBucket]:
+    settings = get_settings()
+    return (
+        asyncio.Semaphore(settings.llm_max_concurrency),
+        TokenBucket(settings.llm_tokens_per_minute),
+    )
+
+
+@asynccontextmanager
+async def llm_limiter(estimated_tokens: int) -> AsyncIterator[LLMUsage]:
+    """Cap in-flight LLM calls and keep token usage under the per-minute budget."""
+    semaphore, bucket = _limits()
+    async with semaphore:
+        await bucket.acquire(estimated_tokens)
+        usage = LLMUsage()
+        try:
+            yield usage
+        finally:
+            if usage.total_tokens is not None:
+                bucket.settle(estimated_tokens, usage.total_tokens)
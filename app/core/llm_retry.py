@@ -0,0 +1,75 @@
+import httpx
+import openai
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Attempts per call, on top of the SDK's own short retries, before giving up
+LLM_RETRY_ATTEMPTS = 6
+
+# Jittered exponential backoff bounds, also the cap on a server's Retry-After
+LLM_RETRY_MIN_SECONDS = 1
+LLM_RETRY_MAX_SECONDS = 60
+
+_backoff = wait_random_exponential(min=LLM_RETRY_MIN_SECONDS, max=LLM_RETRY_MAX_SECONDS)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors and dropped connections are worth retrying."""
+    if isinstance(
+        exc,
+        (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError),
+    ):
+        return True
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+def _retry_after_seconds(exc: BaseException | None) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait(retry_state: RetryCallState) -> float:
+    """Sleep for the server's Retry-After when it sends one, else back off."""
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, LLM_RETRY_MAX_SECONDS)
+    return _backoff(retry_state)
+
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    logger.warning(
+        "Retrying %s after attempt %d: %r",
+        retry_state.fn.__qualname__,
+        retry_state.attempt_number,
+        retry_state.outcome.exception(),
+    )
+
+
+# Each attempt re-runs the whole coroutine, so limiter slots are released while
+# waiting and only the failed call is repeated, not the whole document
+llm_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(LLM_RETRY_ATTEMPTS),
+    wait=_wait,
+    before_sleep=_log_retry,
+    reraise=True,
+)
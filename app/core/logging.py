@@ -1,30 +1,65 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
-from app.core.config import settings
+from app.core.config import get_settings
+
+
+_queue_listener: QueueListener | None = None
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """Queue records as they are, leaving all formatting to the listener thread.
+
+    QueueHandler.prepare formats each record on the emitting thread so it can be
+    pickled; this queue never leaves the process, so that work is skipped.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records and stop the background writer thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
 
 
 def setup_logging() -> None:
     """Configure application logging."""
+    global _queue_listener
 
     # Define log format
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(log_format))
+
+    # Request handlers only enqueue records; a background thread formats and
+    # writes them, so neither formatting nor stdout I/O runs on the event loop
+    _stop_queue_listener()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, stream_handler)
+    _queue_listener.start()
+
     # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO if not settings.debug else logging.DEBUG,
-        format=log_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-        ],
-    )
+    root = logging.getLogger()
+    root.setLevel(logging.INFO if not get_settings().debug else logging.DEBUG)
+    root.handlers = [_DeferredFormatQueueHandler(log_queue)]
 
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-    logging.getLogger("motor").setLevel(logging.WARNING)
+    logging.getLogger("pymongo").setLevel(logging.WARNING)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -1,87 +1,123 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from functools import lru_cache
+from typing import Any, NamedTuple
 
+import bcrypt
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.hash import sha256_crypt
 
-from app.core.config import settings
+from app.core.config import get_settings
+
+BCRYPT_ROUNDS = 12
+
+# bcrypt only uses the first 72 bytes of a password and bcrypt>=5 rejects longer input
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Prefix of hashes created before the switch to bcrypt
+SHA256_CRYPT_PREFIX = "$5$"
+
+
+class _JWTConfig(NamedTuple):
+    signing_key: Key
+    algorithm: str
+    algorithms: list[str]
+    access_token_ttl: timedelta
+    refresh_token_ttl: timedelta
+
+
+@lru_cache(maxsize=1)
+def _jwt_config() -> _JWTConfig:
+    """Resolve the JWT signing parameters once, on first use."""
+    settings = get_settings()
+    return _JWTConfig(
+        # A prebuilt key skips jose's per-call key parsing and construction
+        signing_key=jwk.construct(settings.secret_key, settings.algorithm),
+        algorithm=settings.algorithm,
+        algorithms=[settings.algorithm],
+        access_token_ttl=timedelta(minutes=settings.access_token_expire_minutes),
+        refresh_token_ttl=timedelta(days=settings.refresh_token_expire_days),
+    )
+
+
+def _encode_token(subject: str | Any, token_type: str, expire: datetime) -> str:
+    config = _jwt_config()
+    to_encode = {"exp": expire, "sub": str(subject), "type": token_type}
+    return jwt.encode(to_encode, config.signing_key, algorithm=config.algorithm)
 
 
 def create_access_token(
     subject: str | Any, expires_delta: timedelta | None = None
 ) -> str:
     """Create JWT access token."""
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.access_token_expire_minutes
-        )
-
-    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.secret_key, algorithm=settings.algorithm
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or _jwt_config().access_token_ttl
     )
-    return encoded_jwt
+    return _encode_token(subject, "access", expire)
 
 
 def create_refresh_token(
     subject: str | Any, expires_delta: timedelta | None = None
 ) -> str:
     """Create JWT refresh token."""
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            days=settings.refresh_token_expire_days
-        )
-
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.secret_key, algorithm=settings.algorithm
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or _jwt_config().refresh_token_ttl
     )
-    return encoded_jwt
+    return _encode_token(subject, "refresh", expire)
+
+
+def decode_token(token: str, token_type: str = "access") -> dict[str, Any]:
+    """Verify JWT token and return its claims."""
+    config = _jwt_config()
+    try:
+        payload = jwt.decode(token, config.signing_key, algorithms=config.algorithms)
+    except JWTError:
+        raise _credentials_exception()
+
+    if payload.get("sub") is None or payload.get("type") != token_type:
+        raise _credentials_exception()
+
+    return payload
 
 
 def verify_token(token: str, token_type: str = "access") -> str:
     """Verify JWT token and return subject."""
-    credentials_exception = HTTPException(
+    return decode_token(token, token_type)["sub"]
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
-        subject: str = payload.get("sub")
-        token_type_from_payload: str = payload.get("type")
-
-        if subject is None or token_type_from_payload != token_type:
-            raise credentials_exception
-
-    except JWTError:
-        raise credentials_exception
-
-    return subject
-
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return sha256_crypt.verify(plain_password, hashed_password)
+    if hashed_password.startswith(SHA256_CRYPT_PREFIX):
+        return sha256_crypt.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(
+        plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES], hashed_password.encode()
+    )
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return sha256_crypt.hash(password)
+    return bcrypt.hashpw(
+        password.encode()[:BCRYPT_MAX_PASSWORD_BYTES],
+        bcrypt.gensalt(rounds=BCRYPT_ROUNDS),
+    ).decode()
 
 
 def create_token_pair(user_id: str) -> dict:
     """Create both access and refresh tokens."""
-    access_token = create_access_token(subject=user_id)
-    refresh_token = create_refresh_token(subject=user_id)
+    # Both tokens are issued at the same instant, so read the clock once
+    now = datetime.now(timezone.utc)
+    config = _jwt_config()
+    access_token = _encode_token(user_id, "access", now + config.access_token_ttl)
+    refresh_token = _encode_token(user_id, "refresh", now + config.refresh_token_ttl)
 
     return {
         "access_token": access_token,
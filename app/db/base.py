@@ -1,24 +1,33 @@
-from datetime import datetime, timezone
-from typing import Any
+from typing import Any, ClassVar
 
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import Column, DateTime
+from sqlalchemy.sql import func
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
+    __column_names__: ClassVar[tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # The table is mapped by now, so its column names can be captured once
+        table = getattr(cls, "__table__", None)
+        if table is not None:
+            cls.__column_names__ = tuple(column.name for column in table.columns)
+
     def to_dict(self) -> dict[str, Any]:
         """Convert model instance to dictionary."""
-        return {
-            column.name: getattr(self, column.name) for column in self.__table__.columns
-        }
+        return {name: getattr(self, name) for name in self.__column_names__}
 
 
 class TimestampMixin:
     """Mixin to add created_at and updated_at timestamps."""
 
-    created_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+    # Evaluated by the database per statement; PostgreSQL has no ON UPDATE clause,
+    # so onupdate sends now() with every ORM UPDATE instead
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
 class UUIDMixin:
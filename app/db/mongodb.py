@@ -1,15 +1,17 @@
 from typing import Optional
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 
-from app.core.config import settings
+from app.core.config import get_settings
 
 
 class MongoDB:
     """MongoDB connection manager."""
 
-    client: AsyncIOMotorClient | None = None
-    database: AsyncIOMotorDatabase | None = None
+    client: AsyncMongoClient | None = None
+    database: AsyncDatabase | None = None
 
 
 mongodb = MongoDB()
@@ -17,24 +19,40 @@ mongodb = MongoDB()
 
 async def connect_to_mongo() -> None:
     """Create database connection."""
-    mongodb.client = AsyncIOMotorClient(settings.mongodb_url)
+    # Reuse the existing client and its pool if startup runs more than once
+    if mongodb.client is not None:
+        return
+
+    settings = get_settings()
+    # PyMongo's native asyncio client; Motor ran the sync driver on a thread pool
+    mongodb.client = AsyncMongoClient(
+        settings.mongodb_url,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        compressors=settings.mongodb_compressors,
+        uuidRepresentation="standard",
+    )
     mongodb.database = mongodb.client[settings.mongodb_database]
 
 
 async def close_mongo_connection() -> None:
     """Close database connection."""
     if mongodb.client:
-        mongodb.client.close()
+        await mongodb.client.close()
+        mongodb.client = None
+        mongodb.database = None
 
 
-def get_mongo_database() -> AsyncIOMotorDatabase:
+def get_mongo_database() -> AsyncDatabase:
     """Get MongoDB database instance."""
     if mongodb.database is None:
         raise RuntimeError("MongoDB not initialized")
     return mongodb.database
 
 
-def get_mongo_collection(collection_name: str):
+def get_mongo_collection(collection_name: str) -> AsyncCollection:
     """Get MongoDB collection."""
     database = get_mongo_database()
     return database[collection_name]
@@ -1,3 +1,4 @@
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -5,7 +6,7 @@ from sqlalchemy.ext.asyncio import (
 )
 from fastapi import HTTPException
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.db.base import Base
 
 # SQLAlchemy async engine - created lazily to handle connection failures
@@ -17,6 +18,7 @@ def get_engine():
     """Get or create the database engine."""
     global engine
     if engine is None:
+        settings = get_settings()
         try:
             engine = create_async_engine(
                 settings.postgres_url, echo=settings.debug, future=True
@@ -41,18 +43,16 @@ def get_session_factory():
 
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
-    try:
-        session_factory = get_session_factory()
-        async with session_factory() as session:
-            try:
-                yield session
-            finally:
-                await session.close()
-    except Exception as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Database connection failed: {str(e)}"
-        )
+    # The factory is built at startup; the lazy getter only covers early requests
+    session_factory = AsyncSessionLocal or get_session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        except (DBAPIError, OSError) as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database connection failed: {str(e)}"
+            )
 
 
 async def init_db() -> None:
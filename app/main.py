@@ -3,13 +3,17 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.router import api_router
-from app.core.config import settings
+from app.core.config import get_settings
+from app.core.dependencies import close_clients, warm_up_clients
 from app.core.logging import get_logger, setup_logging
 from app.db.init_db import close_databases, init_databases
+from app.db.session import get_session_factory
 from app.middleware.error_handler import setup_exception_handlers
-from app.middleware.logging import LoggingMiddleware
+from app.middleware.logging import DEFAULT_QUIET_PATHS, LoggingMiddleware
+from app.services.document_service import shutdown_pdf_pool
 
 # Setup logging
 setup_logging()
@@ -22,12 +26,21 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up FastAPI application")
     try:
+        # Creating the engine does not connect, so this works even if Postgres is down
+        get_session_factory()
         await init_databases()
         logger.info("Database connections initialized successfully")
     except Exception as e:
         logger.warning(f"Database initialization failed: {e}")
         logger.info("Application will start without database connections")
 
+    try:
+        warm_up_clients()
+        logger.info("AI clients and RAG graph initialized successfully")
+    except Exception as e:
+        logger.warning(f"AI client initialization failed: {e}")
+        logger.info("Clients will be created on first use")
+
     yield
 
     # Shutdown
@@ -38,9 +51,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Error closing database connections: {e}")
 
+    try:
+        await close_clients()
+        logger.info("HTTP client connections closed successfully")
+    except Exception as e:
+        logger.warning(f"Error closing HTTP client connections: {e}")
+
+    shutdown_pdf_pool()
+
 
 def create_app() -> FastAPI:
     """Create FastAPI application."""
+    settings = get_settings()
 
     app = FastAPI(
         title=settings.app_name,
@@ -48,6 +70,7 @@ def create_app() -> FastAPI:
         version="1.0.0",
         debug=settings.debug,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Setup CORS
@@ -59,16 +82,24 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    quiet_paths = DEFAULT_QUIET_PATHS | {
+        f"{settings.api_v1_prefix}/health/health",
+        f"{settings.api_v1_prefix}/health/ping",
+    }
+
     # Add logging middleware
-    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(LoggingMiddleware, quiet_paths=quiet_paths)
 
     # Add request timing middleware
     @app.middleware("http")
     async def add_process_time_header(request: Request, call_next):
-        start_time = time.time()
+        if request.url.path in quiet_paths:
+            return await call_next(request)
+
+        start_time = time.perf_counter()
         response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
+        process_time = time.perf_counter() - start_time
+        response.headers["X-Process-Time"] = f"{process_time:.6f}"
         return response
 
     # Setup exception handlers
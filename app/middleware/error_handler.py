@@ -1,8 +1,10 @@
 import logging
+from typing import Any
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.logging import get_logger
@@ -10,6 +12,24 @@ from app.schemas.response import ErrorResponse
 
 logger = get_logger(__name__)
 
+# ErrorResponse is serialized once; handlers copy it and fill in the per-error fields
+_ERROR_TEMPLATE = ErrorResponse(message="").model_dump()
+
+_INTERNAL_ERROR_CONTENT = ErrorResponse(
+    message="Internal server error", error_code="INTERNAL_ERROR"
+).model_dump()
+
+
+def _error_content(
+    message: Any, error_code: str, details: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    return {
+        **_ERROR_TEMPLATE,
+        "message": message,
+        "error_code": error_code,
+        "details": details,
+    }
+
 
 def setup_exception_handlers(app: FastAPI) -> None:
     """Setup global exception handlers."""
@@ -18,11 +38,9 @@ def setup_exception_handlers(app: FastAPI) -> None:
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Handle HTTP exceptions."""
         logger.warning(f"HTTP {exc.status_code}: {exc.detail}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
-            content=ErrorResponse(
-                message=exc.detail, error_code=f"HTTP_{exc.status_code}"
-            ).model_dump(),
+            content=_error_content(exc.detail, f"HTTP_{exc.status_code}"),
         )
 
     @app.exception_handler(StarletteHTTPException)
@@ -31,11 +49,9 @@ def setup_exception_handlers(app: FastAPI) -> None:
     ):
         """Handle Starlette HTTP exceptions."""
         logger.warning(f"Starlette HTTP {exc.status_code}: {exc.detail}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
-            content=ErrorResponse(
-                message=exc.detail, error_code=f"STARLETTE_{exc.status_code}"
-            ).model_dump(),
+            content=_error_content(exc.detail, f"STARLETTE_{exc.status_code}"),
         )
 
     @app.exception_handler(RequestValidationError)
@@ -44,22 +60,20 @@ def setup_exception_handlers(app: FastAPI) -> None:
     ):
         """Handle validation errors."""
         logger.warning(f"Validation error: {exc.errors()}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=422,
-            content=ErrorResponse(
-                message="Validation error",
-                error_code="VALIDATION_ERROR",
-                details={"errors": exc.errors()},
-            ).model_dump(),
+            content=_error_content(
+                "Validation error",
+                "VALIDATION_ERROR",
+                {"errors": jsonable_encoder(exc.errors())},
+            ),
         )
 
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         """Handle general exceptions."""
         logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
-            content=ErrorResponse(
-                message="Internal server error", error_code="INTERNAL_ERROR"
-            ).model_dump(),
+            content=_INTERNAL_ERROR_CONTENT,
         )
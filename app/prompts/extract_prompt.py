@@ -1,10 +1,15 @@
-from langchain_core.prompts import ChatPromptTemplate
+from typing import Callable, Dict, List
 
-get_propositions_prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """
+from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate
+
+# System messages hold only static instructions and user messages list inputs from
+# most to least stable, so consecutive calls share the longest cacheable prefix.
+
+PromptRenderer = Callable[..., List[Dict[str, str]]]
+
+# Sent verbatim on every proposition call; one shared string keeps the prefix
+# byte-identical for provider-side prompt caching
+PROPOSITIONS_SYSTEM_PROMPT = """
             Decompose the "Content" into clear and simple propositions, ensuring they are interpretable out of
             context.
             1. Split compound sentence into simple sentences. Maintain the original phrasing from the input
@@ -42,8 +47,11 @@ get_propositions_prompt = ChatPromptTemplate.from_messages(
             throughout Europe.", "German immigrants exported the custom of the Easter Hare/Rabbit to
             Britain and America.", "The custom of the Easter Hare/Rabbit evolved into the Easter Bunny in
             Britain and America."]
-            """,
-        ),
+            """
+
+get_propositions_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", PROPOSITIONS_SYSTEM_PROMPT),
         (
             "human",
             """
@@ -122,7 +130,7 @@ update_chunk_title_prompt = ChatPromptTemplate.from_messages(
 
             A good title will say what the chunk is about.
 
-            You will be given a group of propositions which are in the chunk, chunk summary and the chunk title.
+            You will be given the chunk title, the chunk summary and a group of propositions which are in the chunk.
 
             Your title should anticipate generalization. If you get a proposition about apples, generalize it to food.
             Or month, generalize it to "date and times".
@@ -136,7 +144,7 @@ update_chunk_title_prompt = ChatPromptTemplate.from_messages(
         ),
         (
             "user",
-            "Chunk's propositions:\n{proposition}\n\nChunk summary:\n{current_summary}\n\nCurrent chunk title:\n{current_title}",
+            "Current chunk title:\n{current_title}\n\nChunk summary:\n{current_summary}\n\nChunk's propositions:\n{proposition}",
         ),
     ]
 )
@@ -151,7 +159,7 @@ update_chunk_summary_prompt = ChatPromptTemplate.from_messages(
 
             A good summary will say what the chunk is about, and give any clarifying instructions on what to add to the chunk.
 
-            You will be given a group of propositions which are in the chunk and the chunks current summary.
+            You will be given the chunks current summary and a group of propositions which are in the chunk.
 
             Your summaries should anticipate generalization. If you get a proposition about apples, generalize it to food.
             Or month, generalize it to "date and times".
@@ -165,7 +173,7 @@ update_chunk_summary_prompt = ChatPromptTemplate.from_messages(
         ),
         (
             "user",
-            "Chunk's propositions:\n{proposition}\n\nCurrent chunk summary:\n{current_summary}",
+            "Current chunk summary:\n{current_summary}\n\nChunk's propositions:\n{proposition}",
         ),
     ]
 )
@@ -208,6 +216,46 @@ find_relevant_chunk_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
+batch_find_relevant_chunk_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+            Determine for each "Proposition" in a numbered list whether it should belong to any of the existing chunks.
+
+            A proposition should belong to a chunk of their meaning, direction, or intention are similar.
+            The goal is to group similar propositions and chunks.
+
+            Return one assignment per proposition with its index (prop_idx) and a chunk_id.
+            If you think a proposition should be joined with an existing chunk, use that chunk id.
+            If it does not fit any existing chunk, use "new-" followed by a number. Propositions that
+            should start the same new chunk share the same "new-" id; unrelated ones get different numbers.
+
+            Example:
+            Input:
+                - Current Chunks:
+                    - Chunk ID: 2n4l3d
+                    - Chunk Name: Places in San Francisco
+                    - Chunk Summary: Overview of the things to do with San Francisco Places
+
+                    - Chunk ID: 93833k
+                    - Chunk Name: Food Greg likes
+                    - Chunk Summary: Lists of the food and dishes that Greg likes
+                - Propositions: ["Greg really likes hamburgers", "Greg owns a red bike", "Greg rides his bike to work"]
+            Output: [{{"prop_idx": 0, "chunk_id": "93833k"}}, {{"prop_idx": 1, "chunk_id": "new-1"}}, {{"prop_idx": 2, "chunk_id": "new-1"}}]
+            """,
+        ),
+        (
+            "user",
+            "Current Chunks:\n--Start of current chunks--\n{current_chunk_outline}\n--End of current chunks--",
+        ),
+        (
+            "user",
+            "Assign each of the following propositions (JSON list, indexed from 0):\n{propositions_json}",
+        ),
+    ]
+)
+
 post_process_text_prompt = ChatPromptTemplate.from_messages(
     [
         (
@@ -239,3 +287,39 @@ post_process_text_prompt = ChatPromptTemplate.from_messages(
         ),
     ]
 )
+
+
+def _specialize(prompt: ChatPromptTemplate) -> PromptRenderer:
+    """Flatten a chat prompt into a str.format renderer of plain role/content dicts.
+
+    Templates are read once here, so hot loops skip LangChain's per-call prompt
+    formatting and message wrapping; static messages are rendered up front.
+    """
+    # (role, template, pre-rendered content); exactly one of the last two is set
+    parts = []
+    for m in prompt.messages:
+        role = "system" if isinstance(m, SystemMessagePromptTemplate) else "user"
+        if m.prompt.input_variables:
+            parts.append((role, m.prompt.template, None))
+        else:
+            parts.append((role, None, m.prompt.format()))
+
+    def render(**values: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": role,
+                "content": static if template is None else template.format_map(values),
+            }
+            for role, template, static in parts
+        ]
+
+    return render
+
+
+render_get_propositions = _specialize(get_propositions_prompt)
+render_new_chunk_title = _specialize(new_chunk_title_prompt)
+render_new_chunk_summary = _specialize(new_chunk_summary_prompt)
+render_update_chunk_title = _specialize(update_chunk_title_prompt)
+render_update_chunk_summary = _specialize(update_chunk_summary_prompt)
+render_find_relevant_chunk = _specialize(find_relevant_chunk_prompt)
+render_batch_find_relevant_chunk = _specialize(batch_find_relevant_chunk_prompt)
@@ -1,12 +1,21 @@
 from abc import ABC
-from typing import Any, Generic, TypeVar
+from typing import Any, AsyncIterator, Generic, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import delete, exists, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import Base
 
+# Rows fetched per server-side cursor round trip when streaming results
+STREAM_YIELD_PER = 128
+
+def _partial_dump(obj: BaseModel) -> dict[str, Any]:
+    """Return only the fields explicitly set on a flat update schema."""
+    # Same result as model_dump(exclude_unset=True) without walking unset fields
+    return {name: getattr(obj, name) for name in obj.model_fields_set}
+
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -26,18 +35,48 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType], ABC
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> list[ModelType]:
         """Get multiple records with pagination."""
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
-        return result.scalars().all()
+        return [obj async for obj in self.iter_multi(db, skip=skip, limit=limit)]
+
+    async def iter_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> AsyncIterator[ModelType]:
+        """Stream records with pagination through a server-side cursor."""
+        stmt = (
+            select(self.model)
+            .offset(skip)
+            .limit(limit)
+            .execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        async for obj in await db.stream_scalars(stmt):
+            yield obj
+
+    async def get_page(
+        self, db: AsyncSession, *, after_id: Any = None, limit: int = 100
+    ) -> tuple[list[ModelType], Any | None]:
+        """Get records ordered by ID after a cursor, plus the next page's cursor."""
+        # Keyset pagination seeks on the primary key index instead of walking
+        # and discarding OFFSET rows
+        stmt = select(self.model).order_by(self.model.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(self.model.id > after_id)
+        items = list((await db.scalars(stmt)).all())
+        next_after_id = items[-1].id if len(items) == limit else None
+        return items, next_after_id
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record."""
         obj_data = (
             obj_in.model_dump() if hasattr(obj_in, "model_dump") else obj_in.dict()
         )
-        db_obj = self.model(**obj_data)
-        db.add(db_obj)
+        return await self._insert(db, obj_data)
+
+    async def _insert(self, db: AsyncSession, values: dict[str, Any]) -> ModelType:
+        # INSERT ... RETURNING hydrates server defaults without a refresh SELECT
+        result = await db.execute(
+            insert(self.model).values(**values).returning(self.model)
+        )
+        db_obj = result.scalar_one()
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
     async def update(
@@ -48,29 +87,46 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType], ABC
         obj_in: UpdateSchemaType | dict[str, Any],
     ) -> ModelType:
         """Update an existing record."""
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = (
-                obj_in.model_dump(exclude_unset=True)
-                if hasattr(obj_in, "model_dump")
-                else obj_in.dict(exclude_unset=True)
-            )
-
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        db.add(db_obj)
+        update_data = obj_in if isinstance(obj_in, dict) else _partial_dump(obj_in)
+
+        if not update_data:
+            return db_obj
+
+        return await self.update_by_id(db, id=db_obj.id, obj_in=update_data)
+
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: Any,
+        obj_in: UpdateSchemaType | dict[str, Any],
+    ) -> ModelType | None:
+        """Update a record by ID without loading it first."""
+        update_data = obj_in if isinstance(obj_in, dict) else _partial_dump(obj_in)
+
+        if not update_data:
+            return await self.get(db, id)
+
+        # UPDATE ... RETURNING writes and re-reads the row in one round trip; the
+        # ORM also syncs any loaded instance in the session from the returned values
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        updated_obj = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return updated_obj
 
     async def remove(self, db: AsyncSession, *, id: Any) -> ModelType:
         """Delete a record by ID."""
-        obj = await self.get(db, id)
-        if obj:
-            await db.delete(obj)
-            await db.commit()
+        # DELETE ... RETURNING removes and fetches the row in one round trip
+        result = await db.execute(
+            delete(self.model).where(self.model.id == id).returning(self.model)
+        )
+        obj = result.scalar_one_or_none()
+        await db.commit()
         return obj
 
     async def get_by_field(
@@ -83,5 +139,5 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType], ABC
 
     async def exists(self, db: AsyncSession, *, id: Any) -> bool:
         """Check if a record exists by ID."""
-        obj = await self.get(db, id)
-        return obj is not None
+        result = await db.execute(select(exists().where(self.model.id == id)))
+        return bool(result.scalar())
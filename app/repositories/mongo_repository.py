@@ -1,26 +1,43 @@
+from functools import lru_cache
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
 
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorCollection
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
 
-from app.db.mongodb import get_mongo_collection
+from app.db.mongodb import get_mongo_database
+from app.repositories.base import _partial_dump
 
 DocumentType = TypeVar("DocumentType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+@lru_cache(maxsize=1024)
+def _object_id(id: str) -> ObjectId:
+    """Parse a hex id once; hot documents are looked up repeatedly."""
+    return ObjectId(id)
+
+
 class MongoRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType]):
     """Base repository class for MongoDB documents."""
 
     def __init__(self, collection_name: str, document_class: type[DocumentType]):
         self.collection_name = collection_name
         self.document_class = document_class
+        # Validators are built once so each call goes straight to pydantic-core
+        self._adapter = TypeAdapter(document_class)
+        self._list_adapter = TypeAdapter(list[document_class])
+        self._collection: AsyncCollection | None = None
 
-    def _get_collection(self) -> AsyncIOMotorCollection:
+    def _get_collection(self) -> AsyncCollection:
         """Get MongoDB collection."""
-        return get_mongo_collection(self.collection_name)
+        database = get_mongo_database()
+        # Cached per database handle so a reconnect picks up the new client
+        if self._collection is None or self._collection.database is not database:
+            self._collection = database[self.collection_name]
+        return self._collection
 
     def _convert_id(self, doc: dict[str, Any]) -> dict[str, Any]:
         """Convert ObjectId to string in document."""
@@ -32,10 +49,10 @@ class MongoRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType])
     async def get(self, id: str) -> DocumentType | None:
         """Get a single document by ID."""
         collection = self._get_collection()
-        doc = await collection.find_one({"_id": ObjectId(id)})
+        doc = await collection.find_one({"_id": _object_id(id)})
         if doc:
             doc = self._convert_id(doc)
-            return self.document_class(**doc)
+            return self._adapter.validate_python(doc)
         return None
 
     async def get_multi(
@@ -52,12 +69,32 @@ class MongoRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType])
         cursor = collection.find(filter_dict).skip(skip).limit(limit)
         docs = await cursor.to_list(length=limit)
 
-        result = []
         for doc in docs:
-            doc = self._convert_id(doc)
-            result.append(self.document_class(**doc))
+            self._convert_id(doc)
+        return self._list_adapter.validate_python(docs)
 
-        return result
+    async def get_page(
+        self,
+        *,
+        after_id: str | None = None,
+        limit: int = 100,
+        filter_dict: dict[str, Any] | None = None,
+    ) -> tuple[list[DocumentType], str | None]:
+        """Get documents ordered by ID after a cursor, plus the next page's cursor."""
+        collection = self._get_collection()
+        query = filter_dict or {}
+        if after_id is not None:
+            # Keyset pagination seeks on the _id index instead of walking skipped docs
+            after = {"_id": {"$gt": ObjectId(after_id)}}
+            query = {"$and": [query, after]} if query else after
+
+        cursor = collection.find(query).sort("_id", 1).limit(limit)
+        docs = await cursor.to_list(length=limit)
+        next_after_id = str(docs[-1]["_id"]) if len(docs) == limit else None
+
+        for doc in docs:
+            self._convert_id(doc)
+        return self._list_adapter.validate_python(docs), next_after_id
 
     async def create(self, *, obj_in: CreateSchemaType) -> DocumentType:
         """Create a new document."""
@@ -70,33 +107,32 @@ class MongoRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType])
         doc = await collection.find_one({"_id": result.inserted_id})
         doc = self._convert_id(doc)
 
-        return self.document_class(**doc)
+        return self._adapter.validate_python(doc)
 
     async def update(self, *, id: str, obj_in: UpdateSchemaType) -> DocumentType | None:
         """Update an existing document."""
         collection = self._get_collection()
 
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = (
-                obj_in.model_dump(exclude_unset=True)
-                if hasattr(obj_in, "model_dump")
-                else obj_in.dict(exclude_unset=True)
-            )
+        update_data = obj_in if isinstance(obj_in, dict) else _partial_dump(obj_in)
 
-        await collection.update_one({"_id": ObjectId(id)}, {"$set": update_data})
+        # MongoDB rejects an empty $set, and there is nothing to write anyway
+        if not update_data:
+            return await self.get(id)
 
-        doc = await collection.find_one({"_id": ObjectId(id)})
+        doc = await collection.find_one_and_update(
+            {"_id": _object_id(id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
         if doc:
             doc = self._convert_id(doc)
-            return self.document_class(**doc)
+            return self._adapter.validate_python(doc)
         return None
 
     async def remove(self, *, id: str) -> bool:
         """Delete a document by ID."""
         collection = self._get_collection()
-        result = await collection.delete_one({"_id": ObjectId(id)})
+        result = await collection.delete_one({"_id": _object_id(id)})
         return result.deleted_count > 0
 
     async def get_by_field(self, *, field_name: str, value: Any) -> DocumentType | None:
@@ -105,14 +141,13 @@ class MongoRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType])
         doc = await collection.find_one({field_name: value})
         if doc:
             doc = self._convert_id(doc)
-            return self.document_class(**doc)
+            return self._adapter.validate_python(doc)
         return None
 
     async def exists(self, *, id: str) -> bool:
         """Check if a document exists by ID."""
         collection = self._get_collection()
-        doc = await collection.find_one({"_id": ObjectId(id)})
-        return doc is not None
+        return await collection.count_documents({"_id": _object_id(id)}, limit=1) > 0
 
     async def count(self, *, filter_dict: dict[str, Any] | None = None) -> int:
         """Count documents matching filter."""
@@ -1,13 +1,27 @@
-from typing import Optional
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, case, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.repositories.base import BaseRepository
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.bloom_filter import BloomFilter
+
+# Logins for names missing from the filter rebuild it at most this often
+KNOWN_USERS_REFRESH_SECONDS = 30
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash checked for unknown users so failed logins take the same time."""
+    return get_password_hash("dummy-password-for-timing")
 
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
@@ -15,6 +29,36 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
 
     def __init__(self):
         super().__init__(User)
+        self._known_users: BloomFilter | None = None
+        self._known_users_built_at = float("-inf")
+        self._known_users_lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return time.monotonic() - self._known_users_built_at < KNOWN_USERS_REFRESH_SECONDS
+
+    def _remember(self, user: User) -> None:
+        """Add a user's current username and email to the known users filter."""
+        if self._known_users is not None:
+            self._known_users.add(user.username)
+            self._known_users.add(user.email)
+
+    async def _may_exist(self, db: AsyncSession, value: str) -> bool:
+        """Check the known username/email filter, rebuilding it when stale."""
+        if self._known_users is not None and value in self._known_users:
+            return True
+        if self._is_fresh():
+            return False
+
+        # A burst of unknown names waits for one rebuild instead of each scanning
+        # the users table
+        async with self._known_users_lock:
+            if not self._is_fresh():
+                result = await db.execute(select(User.username, User.email))
+                self._known_users = BloomFilter.from_values(
+                    value for row in result for value in row
+                )
+                self._known_users_built_at = time.monotonic()
+        return value in self._known_users
 
     async def get_by_email(self, db: AsyncSession, *, email: str) -> User | None:
         """Get user by email."""
@@ -24,26 +68,78 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         """Get user by username."""
         return await self.get_by_field(db, field_name="username", value=username)
 
+    async def get_by_username_or_email(
+        self, db: AsyncSession, *, value: str
+    ) -> User | None:
+        """Get user whose username or email matches, preferring a username match."""
+        result = await db.execute(
+            select(User)
+            .where(or_(User.username == value, User.email == value))
+            .order_by(case((User.username == value, 0), else_=1))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_conflicting(
+        self,
+        db: AsyncSession,
+        *,
+        email: str | None = None,
+        username: str | None = None,
+        exclude_id: UUID | None = None,
+    ) -> list[Row]:
+        """Get the email and username of users already holding either value."""
+        conditions = []
+        if email:
+            conditions.append(User.email == email)
+        if username:
+            conditions.append(User.username == username)
+        if not conditions:
+            return []
+
+        # Both columns are unique, so at most one row per value can match
+        stmt = (
+            select(User.email, User.username)
+            .where(or_(*conditions))
+            .limit(len(conditions))
+        )
+        if exclude_id is not None:
+            stmt = stmt.where(User.id != exclude_id)
+        return list((await db.execute(stmt)).all())
+
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """Create a new user with hashed password."""
         obj_data = obj_in.model_dump()
         obj_data["hashed_password"] = get_password_hash(obj_data.pop("password"))
-        db_obj = User(**obj_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        db_obj = await self._insert(db, obj_data)
+        self._remember(db_obj)
         return db_obj
 
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: Any,
+        obj_in: UserUpdate | dict[str, Any],
+    ) -> User | None:
+        """Update a user by ID, keeping renamed users known to the login filter."""
+        user = await super().update_by_id(db, id=id, obj_in=obj_in)
+        if user is not None:
+            self._remember(user)
+        return user
+
     async def authenticate(
         self, db: AsyncSession, *, username: str, password: str
     ) -> User | None:
         """Authenticate user with username/email and password."""
-        # Try to find user by username or email
-        user = await self.get_by_username(db, username=username)
-        if not user:
-            user = await self.get_by_email(db, email=username)
+        user = None
+        if not get_settings().login_user_filter or await self._may_exist(db, username):
+            # One round trip covers both the username and the email login forms
+            user = await self.get_by_username_or_email(db, value=username)
 
         if not user:
+            # Still run the hasher so response time does not reveal unknown users
+            verify_password(password, _dummy_password_hash())
             return None
 
         if not verify_password(password, user.hashed_password):
@@ -51,10 +147,16 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
 
         return user
 
-    async def is_active(self, user: User) -> bool:
+    @staticmethod
+    def is_active(user: User) -> bool:
         """Check if user is active."""
         return user.is_active
 
-    async def is_superuser(self, user: User) -> bool:
+    @staticmethod
+    def is_superuser(user: User) -> bool:
         """Check if user is superuser."""
         return user.is_superuser
+
+
+# Repositories hold no per-request state, so one instance serves every caller
+user_repository = UserRepository()
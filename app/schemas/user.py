@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 
 
 class UserBase(BaseModel):
@@ -71,3 +71,7 @@ class UserList(BaseModel):
     page: int
     size: int
     pages: int
+
+
+# Validates ORM rows and dumps them to JSON bytes in one pass for list endpoints
+USER_LIST_ADAPTER = TypeAdapter(list[User])
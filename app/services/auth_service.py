@@ -1,24 +1,56 @@
+import hashlib
+import time
 from typing import Optional
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
-from app.core.security import create_token_pair, verify_token
+from app.core.security import create_token_pair, decode_token, verify_token
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import user_repository
 from app.schemas.token import LoginRequest, Token
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.query_cache import QueryCache
 
 logger = get_logger(__name__)
 
+# Bursts of requests with the same access token reuse one verify + user lookup.
+# invalidate_token_cache only clears this process, so other workers may keep
+# serving a changed or deleted user for up to this long
+TOKEN_CACHE_TTL_SECONDS = 30
+_token_cache = QueryCache(max_size=10_000, ttl_seconds=TOKEN_CACHE_TTL_SECONDS)
+
+# Everything but the password hash, which never needs to sit in memory
+_CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "full_name",
+    "is_active",
+    "is_superuser",
+    "bio",
+    "avatar_url",
+    "created_at",
+    "updated_at",
+)
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def invalidate_token_cache() -> None:
+    """Drop cached token lookups, e.g. after a user is changed or removed."""
+    _token_cache.invalidate()
+
 
 class AuthService:
     """Authentication service."""
 
     def __init__(self):
-        self.user_repo = UserRepository()
+        self.user_repo = user_repository
 
     async def login(self, db: AsyncSession, login_data: LoginRequest) -> Token:
         """Authenticate user and return tokens."""
@@ -33,7 +65,7 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        if not await self.user_repo.is_active(user):
+        if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
             )
@@ -60,8 +92,14 @@ class AuthService:
 
     async def get_current_user(self, db: AsyncSession, token: str) -> User:
         """Get current user from access token."""
+        key = _token_cache_key(token)
+        snapshot = _token_cache.get(key)
+        if snapshot is not None:
+            # A detached copy, so callers never share an instance across sessions
+            return User(**snapshot)
+
         try:
-            user_id = verify_token(token, token_type="access")
+            claims = decode_token(token, token_type="access")
         except HTTPException:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,17 +107,25 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = await self.user_repo.get(db, id=user_id)
+        user = await self.user_repo.get(db, id=claims["sub"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        if not await self.user_repo.is_active(user):
+        if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
             )
 
+        # A cached token must not outlive its own expiry
+        ttl_seconds = min(TOKEN_CACHE_TTL_SECONDS, claims.get("exp", 0) - time.time())
+        if ttl_seconds > 0:
+            _token_cache.put(
+                key,
+                {name: getattr(user, name) for name in _CACHED_USER_FIELDS},
+                ttl_seconds=ttl_seconds,
+            )
         return user
 
     async def get_current_active_user(self, db: AsyncSession, token: str) -> User:
@@ -89,8 +135,11 @@ class AuthService:
     async def get_current_superuser(self, db: AsyncSession, token: str) -> User:
         """Get current superuser."""
         user = await self.get_current_user(db, token)
-        if not await self.user_repo.is_superuser(user):
+        if not user.is_superuser:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
             )
         return user
+
+
+auth_service = AuthService()
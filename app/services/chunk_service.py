@@ -1,3 +1,4 @@
+import asyncio
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
@@ -6,7 +7,7 @@ from langchain_experimental.text_splitter import BreakpointThresholdType
 from langchain_text_splitters import MarkdownHeaderTextSplitter
 from langchain_core.documents import Document
 from typing import List
-from app.utils.agentic_chunker import AgenticChunker, GetType
+from app.utils.agentic_chunker import AgenticChunker, ChunkerRunnables, GetType
 
 
 class ChunkService:
@@ -17,6 +18,7 @@ class ChunkService:
     ):
         self.embeddings = embeddings
         self.llm = llm
+        self.chunker_runnables = ChunkerRunnables.from_llm(llm)
 
     async def semantic_chunk(
         self,
@@ -29,13 +31,18 @@ class ChunkService:
             breakpoint_threshold_type=breakpoint_threshold_type,
             breakpoint_threshold_amount=breakpoint_threshold_amount,
         )
-        documents = semantic_chunker.create_documents([text])
+        # SemanticChunker only has a blocking API; keep it off the event loop
+        documents = await asyncio.to_thread(semantic_chunker.create_documents, [text])
         return documents
 
     async def agentic_chunk(self, text: str) -> List[Document]:
-        agentic_chunker = AgenticChunker(llm=self.llm)
-        propositions = agentic_chunker.get_propositions(text)
-        agentic_chunker.add_propositions(propositions)
+        agentic_chunker = AgenticChunker(
+            llm=self.llm,
+            runnables=self.chunker_runnables,
+            embeddings=self.embeddings,
+        )
+        propositions = await agentic_chunker.get_propositions(text)
+        await agentic_chunker.add_propositions(propositions)
         chunks = agentic_chunker.get_chunks(get_type=GetType.LIST_OF_STRING)
         documents = [Document(page_content=chunk) for chunk in chunks]
         return documents
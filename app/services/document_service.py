@@ -1,21 +1,121 @@
-from langchain_pymupdf4llm import PyMuPDF4LLMLoader
+from langchain_core.documents.base import Blob
+from langchain_pymupdf4llm import PyMuPDF4LLMParser
 from langchain_community.callbacks import get_openai_callback
 from typing import Optional, Literal
 from langchain_community.document_loaders.parsers import LLMImageBlobParser
 from langchain_openai import ChatOpenAI
-from fastapi import UploadFile
-from pydantic import BaseModel, Field
-from app.core.config import settings
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel
+from app.core.config import get_settings
+from app.core.llm_limiter import llm_limiter
+from app.core.llm_retry import llm_retry
 from llama_cloud_services import LlamaExtract
-from app.core.config import settings
+from llama_cloud_services.extract import ExtractionAgent
 from app.prompts import post_process_text_prompt
 from app.core.logging import get_logger
-import tempfile
+from app.utils.result_cache import ResultCache
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from functools import cached_property, lru_cache
+import asyncio
 import os
+import re
+import tempfile
 
 logger = get_logger(__name__)
 
 
+
+# LlamaExtract agent configured for knowledge base extraction
+LLAMA_EXTRACT_AGENT_NAME = "knowledge-base-extractor"
+
+# Post-processed pages are cached on disk by content; bump the version whenever
+# post_process_text_prompt or KnowledgeDocument changes
+POST_PROCESS_CACHE_DIR = ".cache/post_process"
+POST_PROCESS_CACHE_VERSION = "post-process-v1"
+
+_post_process_cache = ResultCache(POST_PROCESS_CACHE_DIR)
+
+# Uploads are copied to disk this many bytes at a time
+UPLOAD_COPY_CHUNK_BYTES = 1 << 20
+
+# Page delimiters and runs of blank lines collapse to one paragraph break in a
+# single pass, trimming whitespace the post-processing prompt would pay for
+_PAGE_BREAKS = re.compile(r"\s*\f\s*|\n{3,}")
+
+# Rough size heuristic, shared by page packing and the rate limiter estimate
+CHARS_PER_TOKEN = 4
+
+# Consecutive pages are packed into one post-processing call up to this size
+POST_PROCESS_TOKEN_BUDGET = 6_000
+
+
+def _pack_pages(pages: list[str], token_budget: int) -> list[str]:
+    """Greedily join consecutive pages into texts of at most token_budget tokens."""
+    char_budget = token_budget * CHARS_PER_TOKEN
+    packed: list[str] = []
+    current: list[str] = []
+    size = 0
+    for page in pages:
+        # A page over budget on its own still gets a call of its own
+        if current and size + len(page) > char_budget:
+            packed.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(page)
+        size += len(page)
+    if current:
+        packed.append("\n\n".join(current))
+    return packed
+
+
+def _load_pdf_pages(path: str, mode: str) -> list[str]:
+    """Parse a PDF file into page texts. Runs inside a worker process."""
+    parser = PyMuPDF4LLMParser(mode=mode, pages_delimiter="\n\f")
+    return [
+        _PAGE_BREAKS.sub("\n\n", doc.page_content)
+        for doc in parser.lazy_parse(Blob.from_path(path))
+    ]
+
+
+def _copy_to_temp_file(source, max_bytes: int) -> str:
+    """Copy an upload to a temporary file, refusing it once it exceeds max_bytes."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        copied = 0
+        while chunk := source.read(UPLOAD_COPY_CHUNK_BYTES):
+            copied += len(chunk)
+            if copied > max_bytes:
+                break
+            temp_file.write(chunk)
+        else:
+            return temp_file.name
+
+    os.unlink(temp_file.name)
+    raise HTTPException(status_code=413, detail="Upload is too large")
+
+
+@lru_cache(maxsize=1)
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Worker processes for PDF parsing, which is CPU-bound Python per page."""
+    return ProcessPoolExecutor(
+        max_workers=get_settings().pdf_parse_workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF worker processes, dropping parses that have not started."""
+    if get_pdf_pool.cache_info().currsize:
+        get_pdf_pool().shutdown(wait=False, cancel_futures=True)
+    get_pdf_pool.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _get_llama_agent() -> ExtractionAgent:
+    """Look up the extraction agent once; the lookup is a blocking network call."""
+    extractor = LlamaExtract(api_key=get_settings().llama_api_key)
+    return extractor.get_agent(name=LLAMA_EXTRACT_AGENT_NAME)
+
+
 class KnowledgeDocument(BaseModel):
     title: str
     content: str
@@ -24,6 +124,14 @@ class KnowledgeDocument(BaseModel):
 class DocumentService:
     def __init__(self, llm: ChatOpenAI):
         self.llm = llm
+        self._post_process_chain = post_process_text_prompt | llm.with_structured_output(
+            KnowledgeDocument
+        )
+
+    @cached_property
+    def _image_parser(self) -> LLMImageBlobParser:
+        """Image parser, built on the first image extraction and then reused."""
+        return LLMImageBlobParser(model=self.llm)
 
     async def extract_pdf(
         self,
@@ -31,64 +139,99 @@ class DocumentService:
         mode: Literal["single", "page"] = "single",
         extract_images: Optional[bool] = False,
     ) -> str:
-        knowledge_documents: list[KnowledgeDocument] = []
-        for file in files:
-            contents = await file.read()
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(contents)
-                temp_path = temp_file.name
-
-            loader = PyMuPDF4LLMLoader(
-                temp_path,
-                mode=mode,
-                pages_delimiter="\n\f",
-                extract_images=extract_images,
-                images_parser=LLMImageBlobParser(model=self.llm),
-            )
-            docs = loader.load()
+        # Each file is saved, parsed and post-processed independently of the others
+        documents_per_file = await asyncio.gather(
+            *[self._process_one(file, mode, extract_images) for file in files]
+        )
+        return "\n".join(
+            [
+                f"{doc.title}\n\n{doc.content}"
+                for documents in documents_per_file
+                for doc in documents
+            ]
+        )
 
-            for doc in docs:
-                formatted = await self._post_process_text_with_llm(doc.page_content)
-                knowledge_documents.append(formatted)
+    async def _process_one(
+        self, file: UploadFile, mode: str, extract_images: Optional[bool]
+    ) -> list[KnowledgeDocument]:
+        path = await self._save_upload(file)
+        try:
+            pages = await self._load_pages(path, mode, extract_images)
+        finally:
+            os.unlink(path)
+        # llm_limiter bounds how many of these calls run at once
+        return await asyncio.gather(
+            *[
+                self._post_process_text_with_llm(text)
+                for text in _pack_pages(pages, POST_PROCESS_TOKEN_BUDGET)
+            ]
+        )
 
-            os.unlink(temp_path)
+    async def _save_upload(self, file: UploadFile) -> str:
+        """Stream an upload to a temporary file without buffering it in memory."""
+        # Only the path crosses to the worker process, not the file contents
+        return await asyncio.to_thread(
+            _copy_to_temp_file, file.file, get_settings().max_upload_bytes
+        )
 
-        return "\n".join(
-            [f"{doc.title}\n\n{doc.content}" for doc in knowledge_documents]
+    async def _load_pages(
+        self, path: str, mode: str, extract_images: Optional[bool]
+    ) -> list[str]:
+        if not extract_images:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                get_pdf_pool(), _load_pdf_pages, path, mode
+            )
+
+        # The image parser holds the LLM client, which cannot be sent to a worker process
+        parser = PyMuPDF4LLMParser(
+            mode=mode,
+            pages_delimiter="\n\f",
+            extract_images=extract_images,
+            images_parser=self._image_parser,
         )
+        docs = await asyncio.to_thread(parser.parse, Blob.from_path(path))
+        return [_PAGE_BREAKS.sub("\n\n", doc.page_content) for doc in docs]
 
     async def _post_process_text_with_llm(self, text: str) -> KnowledgeDocument:
-        chain = post_process_text_prompt | self.llm.with_structured_output(
-            KnowledgeDocument
+        # Re-uploaded files and repeated pages skip the LLM call entirely
+        key = ResultCache.make_key(
+            POST_PROCESS_CACHE_VERSION, getattr(self.llm, "model_name", ""), text
         )
-
-        with get_openai_callback() as cb:
-            data = chain.invoke({"text": text})
-            logger.info(
-                f"Chain metadata: total tokens:{cb.total_tokens} | total cost: ${cb.total_cost}"
-            )
-            return data
+        cached = await _post_process_cache.get(key)
+        if cached is not None:
+            return KnowledgeDocument.model_validate_json(cached)
+
+        data = await self._invoke_post_process(text)
+        await _post_process_cache.set(key, data.model_dump_json().encode())
+        return data
+
+    @llm_retry
+    async def _invoke_post_process(self, text: str) -> KnowledgeDocument:
+        # Budget for the output as well, which restates the input text
+        async with llm_limiter(2 * len(text) // CHARS_PER_TOKEN) as usage:
+            with get_openai_callback() as cb:
+                data = await self._post_process_chain.ainvoke({"text": text})
+            usage.total_tokens = cb.total_tokens
+        logger.info(
+            "Chain metadata: total tokens:%s | total cost: $%s",
+            cb.total_tokens,
+            cb.total_cost,
+        )
+        return data
 
     async def extract_from_llama(self, files: list[UploadFile]) -> list[dict]:
-        combined_text: list[dict] = []
-        for file in files:
-            contents = await file.read()
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(contents)
-                temp_path = temp_file.name
-
-            class KnowledgeDocument(BaseModel):
-                question: str = Field(description="Question of the answer")
-                answer: str = Field(description="Answer to the question")
-
-            extractor = LlamaExtract(api_key=settings.llama_api_key)
-            agents = extractor.list_agents()
-            knowledge_base_extractor = [
-                agent for agent in agents if agent.name == "knowledge-base-extractor"
-            ][0]
-            result = knowledge_base_extractor.extract(temp_path)
-            print(result.data)
-            combined_text.append(result.data)
-        return combined_text
+        agent = await asyncio.to_thread(_get_llama_agent)
+        return await asyncio.gather(*[self._extract_one(agent, file) for file in files])
+
+    async def _extract_one(self, agent: ExtractionAgent, file: UploadFile) -> dict:
+        path = await self._save_upload(file)
+        try:
+            result = await self._aextract(agent, path)
+        finally:
+            os.unlink(path)
+        return result.data
+
+    @llm_retry
+    async def _aextract(self, agent: ExtractionAgent, path: str):
+        return await agent.aextract(path)
@@ -2,11 +2,13 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import user_repository
+from app.services.auth_service import invalidate_token_cache
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserList, UserUpdate
 
@@ -17,31 +19,44 @@ class UserService:
     """User service for business logic."""
 
     def __init__(self):
-        self.user_repo = UserRepository()
+        self.user_repo = user_repository
 
     async def create_user(self, db: AsyncSession, user_in: UserCreate) -> User:
-        print(user_in)
         """Create a new user."""
-        # Check if user already exists
-        existing_user = await self.user_repo.get_by_email(db, email=user_in.email)
-        if existing_user:
+        # The unique constraints reject duplicates, so no lookup runs up front
+        try:
+            user = await self.user_repo.create(db, obj_in=user_in)
+        except IntegrityError:
+            await db.rollback()
+            await self._ensure_unique(
+                db, email=user_in.email, username=user_in.username
+            )
+            raise
+        logger.info("User %s created successfully", user.username)
+        return user
+
+    async def _ensure_unique(
+        self,
+        db: AsyncSession,
+        *,
+        email: str | None,
+        username: str | None,
+        exclude_id: UUID | None = None,
+    ) -> None:
+        """Raise a 400 naming the email or username another user already holds."""
+        conflicts = await self.user_repo.get_conflicting(
+            db, email=email, username=username, exclude_id=exclude_id
+        )
+        if any(user.email == email for user in conflicts):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-
-        existing_user = await self.user_repo.get_by_username(
-            db, username=user_in.username
-        )
-        if existing_user:
+        if conflicts:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
             )
 
-        user = await self.user_repo.create(db, obj_in=user_in)
-        logger.info(f"User {user.username} created successfully")
-        return user
-
     async def get_user(self, db: AsyncSession, user_id: UUID) -> User:
         """Get user by ID."""
         user = await self.user_repo.get(db, id=user_id)
@@ -62,37 +77,36 @@ class UserService:
         self, db: AsyncSession, user_id: UUID, user_in: UserUpdate
     ) -> User:
         """Update user."""
-        user = await self.get_user(db, user_id)
-
-        # Check if email is being changed and if it's already taken
-        if user_in.email and user_in.email != user.email:
-            existing_user = await self.user_repo.get_by_email(db, email=user_in.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered",
-                )
-
-        # Check if username is being changed and if it's already taken
-        if user_in.username and user_in.username != user.username:
-            existing_user = await self.user_repo.get_by_username(
-                db, username=user_in.username
+        try:
+            updated_user = await self._update_or_404(db, user_id, user_in)
+        except IntegrityError:
+            await db.rollback()
+            # Keeping their own email or username is not a conflict
+            await self._ensure_unique(
+                db, email=user_in.email, username=user_in.username, exclude_id=user_id
             )
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already taken",
-                )
-
-        updated_user = await self.user_repo.update(db, db_obj=user, obj_in=user_in)
-        logger.info(f"User {updated_user.username} updated successfully")
+            raise
+        invalidate_token_cache()
+        logger.info("User %s updated successfully", updated_user.username)
         return updated_user
 
+    async def _update_or_404(
+        self, db: AsyncSession, user_id: UUID, obj_in: UserUpdate | dict
+    ) -> User:
+        # A single UPDATE ... RETURNING both writes the row and finds out it is missing
+        user = await self.user_repo.update_by_id(db, id=user_id, obj_in=obj_in)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        return user
+
     async def delete_user(self, db: AsyncSession, user_id: UUID) -> User:
         """Delete user."""
         user = await self.get_user(db, user_id)
         deleted_user = await self.user_repo.remove(db, id=user_id)
-        logger.info(f"User {user.username} deleted successfully")
+        invalidate_token_cache()
+        logger.info("User %s deleted successfully", user.username)
         return deleted_user
 
     async def get_user_by_email(self, db: AsyncSession, email: str) -> User | None:
@@ -107,20 +121,17 @@ class UserService:
 
     async def activate_user(self, db: AsyncSession, user_id: UUID) -> User:
         """Activate user."""
-        user = await self.get_user(db, user_id)
-        user.is_active = True
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        logger.info(f"User {user.username} activated")
+        user = await self._update_or_404(db, user_id, {"is_active": True})
+        invalidate_token_cache()
+        logger.info("User %s activated", user.username)
         return user
 
     async def deactivate_user(self, db: AsyncSession, user_id: UUID) -> User:
         """Deactivate user."""
-        user = await self.get_user(db, user_id)
-        user.is_active = False
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        logger.info(f"User {user.username} deactivated")
+        user = await self._update_or_404(db, user_id, {"is_active": False})
+        invalidate_token_cache()
+        logger.info("User %s deactivated", user.username)
         return user
+
+
+user_service = UserService()
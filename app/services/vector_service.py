@@ -1,8 +1,27 @@
+import asyncio
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
-from typing import List
+from langchain_core.vectorstores import VectorStore
+from typing import List, Optional
 from langchain_chroma import Chroma
+from app.clients.constants import INGEST_BATCH_SIZE
+from app.clients.vector.chroma_client import CHROMA_CLIENT_SETTINGS
+
+
+async def aadd_documents_in_batches(
+    vector_store: VectorStore,
+    documents: List[Document],
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> List[str]:
+    """Embed and insert documents in concurrent sub-batches."""
+    batches = [
+        documents[i : i + batch_size] for i in range(0, len(documents), batch_size)
+    ]
+    results = await asyncio.gather(
+        *[vector_store.aadd_documents(batch) for batch in batches]
+    )
+    return [doc_id for ids in results for doc_id in ids]
 
 
 class VectorService:
@@ -12,19 +31,31 @@ class VectorService:
             collection_name="documents",
             embedding_function=self.embeddings,
             persist_directory="vector_store",
+            client_settings=CHROMA_CLIENT_SETTINGS,
         )
 
     async def add_documents(self, documents: List[Document]) -> List[Document]:
-        self.vector_store.add_documents(documents)
+        await aadd_documents_in_batches(self.vector_store, documents)
         return documents
 
-    async def query_documents(self, query: str) -> List[Document]:
-        return self.vector_store.similarity_search(query, k=2)
+    async def query_documents(
+        self,
+        query: str,
+        k: int = 2,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict[str, str]] = None,
+    ) -> List[Document]:
+        # MMR re-ranks fetch_k candidates so the k results are not near-duplicates
+        return await self.vector_store.amax_marginal_relevance_search(
+            query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        )
 
     async def delete_documents(self, documents: List[Document]) -> List[Document]:
-        self.vector_store.delete_documents(documents)
+        await self.vector_store.adelete(ids=[doc.id for doc in documents])
         return documents
 
     async def delete_all_documents(self) -> List[Document]:
-        self.vector_store.delete_all_documents()
+        # Chroma has no async reset, so keep the blocking call off the event loop
+        await asyncio.to_thread(self.vector_store.reset_collection)
         return []
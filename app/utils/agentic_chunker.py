@@ -1,18 +1,82 @@
+import asyncio
+import logging
 import uuid
+import numpy as np
+import orjson
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel
-from typing import List
-from rich import print
+from typing import List, NamedTuple, Optional
 from app.prompts.extract_prompt import (
-    new_chunk_title_prompt,
-    new_chunk_summary_prompt,
-    find_relevant_chunk_prompt,
-    update_chunk_title_prompt,
-    update_chunk_summary_prompt,
-    get_propositions_prompt,
+    render_new_chunk_title,
+    render_new_chunk_summary,
+    render_find_relevant_chunk,
+    render_batch_find_relevant_chunk,
+    render_update_chunk_title,
+    render_update_chunk_summary,
+    render_get_propositions,
 )
 from enum import Enum
+from app.core.llm_retry import llm_retry
+from app.core.logging import get_logger
+from app.utils.result_cache import ResultCache
+
+logger = get_logger(__name__)
+
+
+# Propositions classified per find-relevant-chunk LLM call
+PROPOSITION_BATCH_SIZE = 32
+
+# Upper bound on LLM requests the async chunking path keeps in flight
+MAX_CONCURRENT_LLM_CALLS = 32
+
+# Routes proposition calls, which share one static system prompt, to the same
+# OpenAI prompt-cache shard; bump the suffix whenever that prompt changes
+PROPOSITIONS_PROMPT_CACHE_KEY = "propositions-v1"
+
+# Propositions extracted from a document are cached on disk by its content; the
+# prompt cache key above doubles as the cache version
+PROPOSITIONS_CACHE_DIR = ".cache/propositions"
+
+# Past this many chunks, only the ones closest to the propositions being placed
+# are put in the outline, so prompts stop growing with the document
+OUTLINE_MAX_CHUNKS = 20
+
+# A proposition joins its closest chunk without an LLM call when the summary
+# similarity clears the threshold and beats the runner-up by the margin
+CHUNK_MATCH_THRESHOLD = 0.6
+CHUNK_MATCH_MARGIN = 0.05
+
+# A chunk's title and summary are regenerated once it has gained this many
+# propositions since the last refresh; flush() catches up the remainder
+METADATA_REFRESH_EVERY = 4
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+_propositions_cache = ResultCache(PROPOSITIONS_CACHE_DIR)
+
+
+class Sentences(BaseModel):
+    sentences: List[str]
+
+
+class ChunkID(BaseModel):
+    chunk_id: str
+
+
+class ChunkAssignment(BaseModel):
+    prop_idx: int
+    chunk_id: str
+
+
+class ChunkAssignments(BaseModel):
+    assignments: List[ChunkAssignment]
 
 
 class GetType(Enum):
@@ -20,87 +84,188 @@ class GetType(Enum):
     LIST_OF_STRING = "list_of_string"
 
 
+class ChunkerRunnables(NamedTuple):
+    """Structured-output runnables, built once and shared across chunkers."""
+
+    propositions: Runnable
+    find_chunk: Runnable
+    assign_chunks: Runnable
+
+    @classmethod
+    def from_llm(cls, llm: ChatOpenAI) -> "ChunkerRunnables":
+        return cls(
+            propositions=llm.with_structured_output(
+                Sentences, prompt_cache_key=PROPOSITIONS_PROMPT_CACHE_KEY
+            ),
+            find_chunk=llm.with_structured_output(ChunkID),
+            assign_chunks=llm.with_structured_output(ChunkAssignments),
+        )
+
+
 class AgenticChunker:
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(
+        self,
+        llm: ChatOpenAI,
+        runnables: Optional[ChunkerRunnables] = None,
+        embeddings: Optional[Embeddings] = None,
+    ):
         self.llm = llm
+        self.runnables = runnables or ChunkerRunnables.from_llm(llm)
+        self.embeddings = embeddings
         self.chunks = {}
+        # Per-chunk outline entries, rewritten only when that chunk's metadata changes
+        self._outline_parts: dict[str, str] = {}
+        # Unit-length summary embeddings as rows of one matrix, in outline order, so
+        # scoring every chunk is a single matmul; rows are re-embedded when the
+        # summary changes
+        self._chunk_ids: list[str] = []
+        self._chunk_rows: dict[str, int] = {}
+        self._summary_matrix: np.ndarray | None = None
+        self._unembedded: set[str] = set()
+        # Propositions added to each chunk since its title and summary were written
+        self._stale: dict[str, int] = {}
         self.id_truncate_limit = 5
 
         # on new information update title and summary
         self.print_logging = True
         self.generate_new_metadata = True
 
-    def _get_new_chunk_title(self, summary):
-        chain = new_chunk_title_prompt | self.llm
-        return chain.invoke({"summary": summary}).content
-
-    def _get_new_chunk_summary(self, proposition):
-        chain = new_chunk_summary_prompt | self.llm
-        return chain.invoke({"proposition": proposition}).content
-
-    def _update_chunk_title(self, chunk):
-        chain = update_chunk_title_prompt | self.llm
-        return chain.invoke(
-            {
-                "proposition": chunk["propositions"][-1],
-                "current_summary": chunk["summary"],
-                "current_title": chunk["title"],
-            }
-        ).content
-
-    def _update_chunk_summary(self, chunk):
-        chain = update_chunk_summary_prompt | self.llm
-        return chain.invoke(
-            {
-                "proposition": chunk["propositions"][-1],
-                "current_summary": chunk["summary"],
-            }
-        ).content
-
-    def _create_new_chunk(self, proposition):
-        new_chunk_id = str(uuid.uuid4())
-        new_chunk_summary = self._get_new_chunk_summary(proposition=proposition)
-        new_chunk_title = self._get_new_chunk_title(summary=new_chunk_summary)
+        self._llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+    @llm_retry
+    async def _ainvoke(self, runnable, messages):
+        async with self._llm_semaphore:
+            return await runnable.ainvoke(messages)
+
+    async def _get_new_chunk_title(self, summary):
+        response = await self._ainvoke(
+            self.llm, render_new_chunk_title(summary=summary)
+        )
+        return response.content
+
+    async def _get_new_chunk_summary(self, proposition):
+        response = await self._ainvoke(
+            self.llm, render_new_chunk_summary(proposition=proposition)
+        )
+        return response.content
+
+    async def _update_chunk_title(self, chunk, propositions):
+        response = await self._ainvoke(
+            self.llm,
+            render_update_chunk_title(
+                proposition=propositions,
+                current_summary=chunk["summary"],
+                current_title=chunk["title"],
+            ),
+        )
+        return response.content
+
+    async def _update_chunk_summary(self, chunk, propositions):
+        response = await self._ainvoke(
+            self.llm,
+            render_update_chunk_summary(
+                proposition=propositions,
+                current_summary=chunk["summary"],
+            ),
+        )
+        return response.content
 
+    async def _create_new_chunk(self, proposition):
+        new_chunk_id = self._register_chunk(proposition)
+        await self._set_new_chunk_metadata(new_chunk_id)
+        return new_chunk_id
+
+    def _register_chunk(self, proposition):
+        """Add a chunk whose title and summary are filled in afterwards."""
+        new_chunk_id = str(uuid.uuid4())
         self.chunks[new_chunk_id] = {
             "chunk_id": new_chunk_id,
-            "title": new_chunk_title,
-            "summary": new_chunk_summary,
+            "title": None,
+            "summary": None,
             "propositions": [proposition],
             "chunk_index": len(self.chunks),
         }
+        return new_chunk_id
+
+    async def _set_new_chunk_metadata(self, chunk_id):
+        chunk = self.chunks[chunk_id]
+        chunk["summary"] = await self._get_new_chunk_summary(
+            proposition=chunk["propositions"][0]
+        )
+        chunk["title"] = await self._get_new_chunk_title(summary=chunk["summary"])
+        self._refresh_outline_part(chunk_id)
 
         if self.print_logging:
-            print(f"Created new chunk {new_chunk_id}: {new_chunk_title}")
+            logger.debug("Created new chunk %s: %s", chunk_id, chunk["title"])
+
+    def _refresh_outline_part(self, chunk_id):
+        chunk = self.chunks[chunk_id]
+        self._outline_parts[chunk_id] = (
+            f"- Chunk ID: ({chunk_id})\n"
+            f"- Chunk Title: {chunk['title']}\n"
+            f"- Summary: {chunk['summary']}\n\n"
+        )
+        if chunk_id not in self._chunk_rows:
+            self._chunk_rows[chunk_id] = len(self._chunk_ids)
+            self._chunk_ids.append(chunk_id)
+        self._unembedded.add(chunk_id)
 
-    def _get_chunk_outline(self):
+    def _get_chunk_outline(self, chunk_ids=None):
         """
-        Get a string outline of the current chunks
+        Get a string outline of the current chunks, or of chunk_ids only
         """
-        chunk_outline = ""
-
-        for chunk_id, chunk in self.chunks.items():
-            single_chunk_string = f"""
-            - Chunk ID: ({chunk_id})\n
-            - Chunk Title:{chunk["title"]}\n
-            - Summary: {chunk["summary"]}\n\n
-            """
-
-            chunk_outline += single_chunk_string
-
-        return chunk_outline
-
-    def _find_relevant_chunk(self, proposition):
-        class ChunkID(BaseModel):
-            chunk_id: str
-
-        current_chunk_outline = self._get_chunk_outline()
-        chain = find_relevant_chunk_prompt | self.llm.with_structured_output(ChunkID)
-        chunk_found = chain.invoke(
-            {
-                "proposition": proposition,
-                "current_chunk_outline": current_chunk_outline,
-            }
+        if chunk_ids is None:
+            return "".join(self._outline_parts.values())
+        return "".join(self._outline_parts[chunk_id] for chunk_id in chunk_ids)
+
+    @llm_retry
+    async def _embed(self, texts):
+        return _normalize(await self.embeddings.aembed_documents(texts))
+
+    async def _similarity(self, proposition_vectors):
+        """Cosine similarity of each proposition against each outlined chunk."""
+        if self._unembedded:
+            missing = list(self._unembedded)
+            vectors = await self._embed([self.chunks[c]["summary"] for c in missing])
+            self._store_summary_vectors(missing, vectors)
+        chunk_ids = self._chunk_ids
+        return chunk_ids, proposition_vectors @ self._summary_matrix[: len(chunk_ids)].T
+
+    def _store_summary_vectors(self, chunk_ids, vectors):
+        rows_needed = len(self._chunk_ids)
+        matrix = self._summary_matrix
+        if matrix is None or len(matrix) < rows_needed:
+            # Growing by doubling keeps the copy cost amortized per added chunk
+            capacity = max(rows_needed, 2 * (0 if matrix is None else len(matrix)))
+            grown = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            if matrix is not None:
+                grown[: len(matrix)] = matrix
+            self._summary_matrix = matrix = grown
+        matrix[[self._chunk_rows[c] for c in chunk_ids]] = vectors
+        self._unembedded.difference_update(chunk_ids)
+
+    async def _get_outline_for(self, propositions, proposition_vectors=None):
+        """Outline limited to the chunks most similar to the propositions."""
+        if self.embeddings is None or len(self._outline_parts) <= OUTLINE_MAX_CHUNKS:
+            return self._get_chunk_outline()
+
+        if proposition_vectors is None:
+            proposition_vectors = await self._embed(propositions)
+        chunk_ids, similarity = await self._similarity(proposition_vectors)
+        # Each proposition keeps its best match; the rest go by best similarity
+        ranked = dict.fromkeys(similarity.argmax(axis=1).tolist())
+        ranked.update(dict.fromkeys(np.argsort(-similarity.max(axis=0)).tolist()))
+        keep = sorted(list(ranked)[: max(OUTLINE_MAX_CHUNKS, len(propositions))])
+        return self._get_chunk_outline([chunk_ids[i] for i in keep])
+
+    async def _find_relevant_chunk(self, proposition):
+        current_chunk_outline = await self._get_outline_for([proposition])
+        chunk_found = await self._ainvoke(
+            self.runnables.find_chunk,
+            render_find_relevant_chunk(
+                proposition=proposition,
+                current_chunk_outline=current_chunk_outline,
+            ),
         )
 
         if chunk_found.chunk_id is None:
@@ -108,42 +273,170 @@ class AgenticChunker:
 
         return chunk_found.chunk_id
 
-    def _add_proposition_to_chunk(self, chunk_id, proposition):
-        self.chunks[chunk_id]["propositions"].append(proposition)
+    async def _match_by_embedding(self, proposition_vectors):
+        """Assign propositions whose closest chunk is a clear winner."""
+        chunk_ids, similarity = await self._similarity(proposition_vectors)
+        if len(chunk_ids) == 1:
+            runner_up = np.zeros(len(similarity))
+        else:
+            runner_up = np.partition(similarity, -2, axis=1)[:, -2]
+        best = similarity.argmax(axis=1)
+        best_score = similarity.max(axis=1)
+        confident = (best_score >= CHUNK_MATCH_THRESHOLD) & (
+            best_score - runner_up >= CHUNK_MATCH_MARGIN
+        )
+        return {int(i): chunk_ids[best[i]] for i in np.flatnonzero(confident)}
+
+    async def _find_relevant_chunks(self, propositions, proposition_vectors=None):
+        """Assign a batch of propositions to chunk ids with one LLM call."""
+        chunk_assignments = await self._ainvoke(
+            self.runnables.assign_chunks,
+            render_batch_find_relevant_chunk(
+                current_chunk_outline=await self._get_outline_for(
+                    propositions, proposition_vectors
+                ),
+                # orjson keeps non-ASCII text as-is, like ensure_ascii=False
+                propositions_json=orjson.dumps(propositions).decode(),
+            ),
+        )
+        # The outline wraps ids in parentheses, which models sometimes echo back
+        return {
+            a.prop_idx: a.chunk_id.strip().strip("()")
+            for a in chunk_assignments.assignments
+        }
+
+    async def _add_proposition_to_chunk(
+        self, chunk_id, proposition, update_metadata=True
+    ):
+        self._append_proposition(chunk_id, proposition)
         # update title and summary of the chunk
-        if self.generate_new_metadata:
-            self.chunks[chunk_id]["title"] = self._update_chunk_title(
-                self.chunks[chunk_id]
-            )
-            self.chunks[chunk_id]["summary"] = self._update_chunk_summary(
-                self.chunks[chunk_id]
-            )
+        if self.generate_new_metadata and update_metadata:
+            await self._refresh_stale_chunks([chunk_id])
+
+    def _append_proposition(self, chunk_id, proposition):
+        self.chunks[chunk_id]["propositions"].append(proposition)
+        self._stale[chunk_id] = self._stale.get(chunk_id, 0) + 1
+
+    async def _refresh_stale_chunks(self, chunk_ids, force=False):
+        """Update chunks that have gained enough propositions, or all if forced."""
+        await asyncio.gather(
+            *[
+                self._update_chunk_metadata(chunk_id)
+                for chunk_id in chunk_ids
+                if force or self._stale.get(chunk_id, 0) >= METADATA_REFRESH_EVERY
+            ]
+        )
 
-    def add_proposition(self, proposition):
+    async def _update_chunk_metadata(self, chunk_id):
+        chunk = self.chunks[chunk_id]
+        added = self._stale.pop(chunk_id, 1)
+        propositions = "\n".join(chunk["propositions"][-added:])
+        # Both prompts read the pre-update summary, so they can run together
+        chunk["title"], chunk["summary"] = await asyncio.gather(
+            self._update_chunk_title(chunk, propositions),
+            self._update_chunk_summary(chunk, propositions),
+        )
+        self._refresh_outline_part(chunk_id)
+
+    async def add_proposition(self, proposition):
         # create new chunk if chunks are empty
         if len(self.chunks) == 0:
-            self._create_new_chunk(proposition)
+            await self._create_new_chunk(proposition)
             return
 
-        chunk_id = self._find_relevant_chunk(proposition)
+        chunk_id = await self._find_relevant_chunk(proposition)
 
         if chunk_id == None or chunk_id == "No chunks":
-            self._create_new_chunk(proposition)
+            await self._create_new_chunk(proposition)
             return
 
-        self._add_proposition_to_chunk(chunk_id, proposition)
+        await self._add_proposition_to_chunk(chunk_id, proposition)
         return
 
-    def add_propositions(self, propositions):
-        for proposition in propositions:
-            self.add_proposition(proposition)
+    async def add_propositions(self, propositions, batch_size=PROPOSITION_BATCH_SIZE):
+        propositions = list(propositions)
+        # Seed the first chunk so the batch prompt always has an outline to match
+        if not self.chunks and propositions:
+            await self._create_new_chunk(propositions.pop(0))
+
+        # Each batch is matched against the chunks the previous batches produced
+        for start in range(0, len(propositions), batch_size):
+            await self._add_proposition_batch(propositions[start : start + batch_size])
+        await self.flush()
+
+    async def flush(self):
+        """Regenerate the title and summary of every chunk with pending additions."""
+        if self.generate_new_metadata:
+            await self._refresh_stale_chunks(list(self._stale), force=True)
+
+    async def _add_proposition_batch(self, propositions):
+        assignments = {}
+        pending = list(range(len(propositions)))
+        vectors = None
+        if self.embeddings is not None:
+            # One embedding call routes the clear-cut propositions locally
+            vectors = await self._embed(propositions)
+            assignments = await self._match_by_embedding(vectors)
+            pending = [idx for idx in pending if idx not in assignments]
+
+        # Only ambiguous or unmatched propositions are left to the LLM
+        if pending:
+            found = await self._find_relevant_chunks(
+                [propositions[idx] for idx in pending],
+                None if vectors is None else vectors[pending],
+            )
+            assignments.update(
+                {
+                    pending[idx]: chunk_id
+                    for idx, chunk_id in found.items()
+                    # Indices are into the pending sub-list; drop any out of range
+                    if 0 <= idx < len(pending)
+                }
+            )
+        new_chunks, updated_chunks = self._assign_batch(propositions, assignments)
 
-    def get_propositions(self, text: str):
-        class Sentences(BaseModel):
-            sentences: List[str]
+        await asyncio.gather(
+            *[self._set_new_chunk_metadata(chunk_id) for chunk_id in new_chunks]
+        )
+        # Metadata of chunks that only grew a little is left for a later refresh
+        if self.generate_new_metadata:
+            await self._refresh_stale_chunks(updated_chunks)
+
+    def _assign_batch(self, propositions, assignments):
+        """Place a batch of propositions and return the new and grown chunk ids."""
+        new_chunks = {}
+        updated_chunks = set()
+
+        for idx, proposition in enumerate(propositions):
+            chunk_id = assignments.get(idx)
+            if chunk_id in self.chunks and chunk_id not in new_chunks.values():
+                self._append_proposition(chunk_id, proposition)
+                updated_chunks.add(chunk_id)
+                continue
+
+            # Unmatched propositions sharing a "new-" id start one chunk together
+            group = chunk_id if chunk_id and chunk_id.startswith("new") else idx
+            if group in new_chunks:
+                self._append_proposition(new_chunks[group], proposition)
+                updated_chunks.add(new_chunks[group])
+            else:
+                new_chunks[group] = self._register_chunk(proposition)
+
+        return list(new_chunks.values()), updated_chunks
+
+    async def get_propositions(self, text: str):
+        key = ResultCache.make_key(
+            PROPOSITIONS_PROMPT_CACHE_KEY, getattr(self.llm, "model_name", ""), text
+        )
+        cached = await _propositions_cache.get(key)
+        if cached is not None:
+            return Sentences.model_validate_json(cached).sentences
 
-        chain = get_propositions_prompt | self.llm.with_structured_output(Sentences)
-        return chain.invoke({"input": text}).sentences
+        result = await self._ainvoke(
+            self.runnables.propositions, render_get_propositions(input=text)
+        )
+        await _propositions_cache.set(key, result.model_dump_json().encode())
+        return result.sentences
 
     def get_chunks(self, get_type: GetType = GetType.DICT):
         if get_type == GetType.DICT:
@@ -152,21 +445,23 @@ class AgenticChunker:
         if get_type == GetType.LIST_OF_STRING:
             chunks = []
             for chunk_id, chunk in self.chunks.items():
-                print(chunk)
                 chunks.append(" ".join([x for x in chunk["propositions"]]))
             return chunks
 
     def pretty_print_chunks(self):
-        print(f"Chunks length: {len(self.chunks)}\n")
+        # Building the dump walks every proposition, so skip it unless it is shown
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        lines = [f"Chunks length: {len(self.chunks)}\n"]
         for chunk_id, chunk in self.chunks.items():
-            print(f"Chunk ID: {chunk_id}")
-            print(f"Title: {chunk['title']}")
-            print(f"Summary: {chunk['summary']}")
-            print(f"Propositions:")
-            for proposition in chunk["propositions"]:
-                print(f"- {proposition}")
-            print("\n\n")
+            lines.append(f"Chunk ID: {chunk_id}")
+            lines.append(f"Title: {chunk['title']}")
+            lines.append(f"Summary: {chunk['summary']}")
+            lines.append("Propositions:")
+            lines.extend(f"- {proposition}" for proposition in chunk["propositions"])
+            lines.append("\n")
+        logger.debug("\n".join(lines))
 
     def pretty_print_chunk_outline(self):
-        print("Chunk outline:\n")
-        print(self._get_chunk_outline())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Chunk outline:\n\n%s", self._get_chunk_outline())
@@ -0,0 +1,42 @@
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter: no false negatives, rare false positives."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[str], false_positive_rate: float = 0.001
+    ) -> "BloomFilter":
+        values = list(values)
+        # Headroom so values added after the build keep the rate close to target
+        bloom = cls(2 * len(values), false_positive_rate)
+        for value in values:
+            bloom.add(value)
+        return bloom
+
+    def _positions(self, value: str) -> Iterable[int]:
+        # Double hashing: two 64-bit halves of one digest stand in for k hashes
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value)
+        )
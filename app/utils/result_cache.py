@@ -0,0 +1,26 @@
+import hashlib
+
+from langchain.storage import LocalFileStore
+
+
+class ResultCache:
+    """On-disk cache of LLM results, keyed by a hash of everything that shaped them."""
+
+    def __init__(self, directory: str):
+        self._store = LocalFileStore(directory)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            # The separator keeps ("ab", "c") and ("a", "bc") from colliding
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> bytes | None:
+        (value,) = await self._store.amget([key])
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._store.amset([(key, value)])
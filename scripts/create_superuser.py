@@ -1,44 +1,48 @@
+import argparse
 import asyncio
 import os
 import sys
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select
 
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.security import get_password_hash
 from app.db.init_db import init_databases
-from app.db.session import AsyncSessionLocal
+from app.db.session import get_session_factory
 from app.models.user import User
 
 
-async def create_superuser():
+async def create_superuser(skip_init: bool = False):
     """Create a superuser account."""
-    await init_databases()
+    if not skip_init:
+        await init_databases()
 
-    async with AsyncSessionLocal() as db:
+    async with get_session_factory()() as db:
         # Check if superuser already exists
         existing_user = await db.execute(
-            "SELECT id FROM users WHERE is_superuser = true LIMIT 1"
+            select(User.id).where(User.is_superuser.is_(True)).limit(1)
         )
         if existing_user.scalar_one_or_none():
             print("Superuser already exists!")
             return
 
-        # Create superuser
-        superuser = User(
-            email="admin@example.com",
-            username="admin",
-            hashed_password=get_password_hash("admin123"),
-            full_name="Administrator",
-            is_active=True,
-            is_superuser=True,
+        # Create superuser; RETURNING fills in server defaults without a refresh
+        result = await db.execute(
+            insert(User)
+            .values(
+                email="admin@example.com",
+                username="admin",
+                hashed_password=get_password_hash("admin123"),
+                full_name="Administrator",
+                is_active=True,
+                is_superuser=True,
+            )
+            .returning(User)
         )
-
-        db.add(superuser)
+        superuser = result.scalar_one()
         await db.commit()
-        await db.refresh(superuser)
 
         print(f"Superuser created successfully!")
         print(f"Email: {superuser.email}")
@@ -47,4 +51,11 @@ async def create_superuser():
 
 
 if __name__ == "__main__":
-    asyncio.run(create_superuser())
+    parser = argparse.ArgumentParser(description=create_superuser.__doc__)
+    parser.add_argument(
+        "--skip-init",
+        action="store_true",
+        help="Skip database initialization when the tables already exist",
+    )
+    args = parser.parse_args()
+    asyncio.run(create_superuser(skip_init=args.skip_init))
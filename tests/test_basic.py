@@ -38,3 +38,12 @@ def test_ping_endpoint(client):
     data = response.json()
     assert "message" in data
     assert data["message"] == "pong"
+
+
+def test_rag_cache_stats_endpoint(client):
+    """Test the RAG retrieval cache stats endpoint."""
+    response = client.get("/api/v1/rag/cache/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert "hits" in data
+    assert "misses" in data
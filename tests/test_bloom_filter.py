@@ -0,0 +1,36 @@
+"""Tests for the Bloom filter behind the login user filter."""
+
+from app.utils.bloom_filter import BloomFilter
+
+
+def test_from_values_has_no_false_negatives():
+    """Every value the filter was built from is reported as present."""
+    values = [f"user{i}@example.com" for i in range(5000)]
+    bloom = BloomFilter.from_values(values)
+    assert all(value in bloom for value in values)
+
+
+def test_added_values_have_no_false_negatives():
+    """Values added after the build are reported as present too."""
+    bloom = BloomFilter.from_values(["alice", "bob"])
+    added = [f"new-user-{i}" for i in range(100)]
+    for value in added:
+        bloom.add(value)
+    assert all(value in bloom for value in ["alice", "bob", *added])
+
+
+def test_false_positive_rate_stays_near_target():
+    """Unknown values are rarely reported as present."""
+    bloom = BloomFilter.from_values(f"user{i}" for i in range(5000))
+    probes = [f"stranger{i}" for i in range(20_000)]
+    false_positives = sum(value in bloom for value in probes)
+    assert false_positives / len(probes) < 0.01
+
+
+def test_empty_table_builds_a_usable_filter():
+    """A build from no users reports nothing and still accepts additions."""
+    bloom = BloomFilter.from_values([])
+    assert "alice" not in bloom
+
+    bloom.add("alice")
+    assert "alice" in bloom
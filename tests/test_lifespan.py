@@ -0,0 +1,27 @@
+"""Tests for client lifecycle across application lifespans."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import ClientFactory
+from app.core.config import get_settings
+from app.main import app
+
+
+@pytest.fixture
+def openai_api_key(monkeypatch):
+    """Provide a dummy OpenAI key so clients can be built without network access."""
+    monkeypatch.setattr(get_settings(), "openai_api_key", "sk-test")
+
+
+def test_shutdown_drops_clients_bound_to_closed_http_clients(openai_api_key):
+    """A second lifespan must not reuse clients whose HTTP client was closed."""
+    with TestClient(app):
+        first = ClientFactory.get_openai_llm_client(model="gpt-4o-mini")
+
+    assert first.http_async_client.is_closed
+
+    with TestClient(app):
+        second = ClientFactory.get_openai_llm_client(model="gpt-4o-mini")
+        assert second is not first
+        assert not second.http_async_client.is_closed
@@ -0,0 +1,122 @@
+"""Tests for the LLM token bucket and concurrency limiter."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import llm_limiter as limiter_module
+from app.core.llm_limiter import TokenBucket, llm_limiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a test or a sleep advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive the limiter's clock and sleeps by hand."""
+    fake = FakeClock()
+    monkeypatch.setattr(
+        limiter_module, "time", SimpleNamespace(monotonic=fake.monotonic)
+    )
+    monkeypatch.setattr(limiter_module.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_acquire_within_budget_does_not_wait(clock):
+    """A request the bucket already covers is spent immediately."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    await bucket.acquire(200)
+    assert clock.sleeps == []
+    assert bucket._tokens == 400
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time_up_to_capacity(clock):
+    """Spent tokens come back at the per-minute rate, never beyond capacity."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    await bucket.acquire(600)
+
+    clock.now += 30
+    await bucket.acquire(0)
+    assert bucket._tokens == pytest.approx(300)
+
+    clock.now += 600
+    await bucket.acquire(0)
+    assert bucket._tokens == 600
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_the_missing_tokens(clock):
+    """An empty bucket sleeps just long enough to refill the shortfall."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    await bucket.acquire(600)
+    await bucket.acquire(100)
+    # 600 tokens per minute is 10 per second, so 100 tokens take 10 seconds
+    assert sum(clock.sleeps) == pytest.approx(10)
+    assert bucket._tokens == pytest.approx(0)
+
+
+@pytest.mark.asyncio
+async def test_oversized_request_waits_for_a_full_bucket_only(clock):
+    """A request larger than the capacity is clamped instead of waiting forever."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    await bucket.acquire(600)
+    await asyncio.wait_for(bucket.acquire(10_000), timeout=1)
+    assert sum(clock.sleeps) == pytest.approx(60)
+    assert bucket._tokens == pytest.approx(0)
+
+
+def test_settle_refunds_an_overestimate(clock):
+    """Unused tokens from the estimate return to the bucket."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    bucket._tokens = 100
+    bucket.settle(estimated_tokens=300, actual_tokens=100)
+    assert bucket._tokens == 300
+
+
+def test_settle_refund_is_capped_at_capacity(clock):
+    """A refund never grows the bucket past its capacity."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    bucket.settle(estimated_tokens=500, actual_tokens=0)
+    assert bucket._tokens == 600
+
+
+def test_settle_charges_an_underestimate(clock):
+    """Usage beyond the estimate is charged, even below zero."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    bucket._tokens = 50
+    bucket.settle(estimated_tokens=100, actual_tokens=300)
+    assert bucket._tokens == -150
+
+
+@pytest.mark.asyncio
+async def test_llm_limiter_settles_reported_usage(clock, monkeypatch):
+    """The context manager spends the estimate and settles the real usage."""
+    bucket = TokenBucket(tokens_per_minute=600)
+    monkeypatch.setattr(
+        limiter_module, "_limits", lambda: (asyncio.Semaphore(1), bucket)
+    )
+
+    async with llm_limiter(300) as usage:
+        assert bucket._tokens == 300
+        usage.total_tokens = 100
+    assert bucket._tokens == 500
+
+    async with llm_limiter(300):
+        pass
+    # Without reported usage the estimate stays spent
+    assert bucket._tokens == 200
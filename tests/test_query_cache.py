@@ -0,0 +1,99 @@
+"""Tests for the in-memory LRU cache with per-entry TTL."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import query_cache as query_cache_module
+from app.utils.query_cache import QueryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's monotonic clock with one the test advances."""
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        query_cache_module, "time", SimpleNamespace(monotonic=lambda: fake.now)
+    )
+    return fake
+
+
+def test_get_returns_stored_value(clock):
+    """A stored value is returned until it expires."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    """A full cache drops the entry that was read or written longest ago."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl(clock):
+    """An entry is served up to its TTL and dropped after it."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+
+    clock.now += 60
+    assert cache.get("a") == 1
+
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    """An explicit TTL on put replaces the cache-wide one for that entry."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("short", 1, ttl_seconds=5)
+    cache.put("default", 2)
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == 2
+
+
+def test_invalidate_drops_all_entries(clock):
+    """Invalidation empties the cache."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    cache.invalidate()
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_stats_count_hits_and_misses(clock):
+    """Hits, misses and expired lookups are reflected in the stats."""
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    clock.now += 61
+    cache.get("a")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["max_size"] == 2
+    assert stats["ttl_seconds"] == 60
+
+
+def test_make_key_keeps_parts_apart():
+    """Keys differ when the same text is split into different parts."""
+    assert QueryCache.make_key("ab", "c") != QueryCache.make_key("a", "bc")
+    assert QueryCache.make_key("a", "b") == QueryCache.make_key("a", "b")
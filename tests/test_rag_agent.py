@@ -0,0 +1,26 @@
+"""Tests for RAG agent retrieval caching."""
+
+from unittest.mock import MagicMock
+
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from app.agents.rag_agent import RAGAgent
+from app.clients.embeddings.openai_embedding_client import OpenAIEmbeddingClient
+
+
+def _agent(embedding_model: str, tmp_path) -> RAGAgent:
+    embeddings = OpenAIEmbeddingClient(
+        api_key="sk-test", model=embedding_model, cache_dir=str(tmp_path)
+    ).get_client()
+    retriever = InMemoryVectorStore(embeddings).as_retriever(
+        search_type="mmr", search_kwargs={"k": 4}
+    )
+    return RAGAgent(retriever, MagicMock(), embedding_model)
+
+
+def test_cache_namespace_differs_per_embedding_model(tmp_path):
+    """Agents over different embedding models must not share cached retrievals."""
+    small = _agent("text-embedding-3-small", tmp_path)
+    large = _agent("text-embedding-3-large", tmp_path)
+    assert small._cache_namespace != large._cache_namespace
+    assert small._cache_namespace.startswith("text-embedding-3-small:")
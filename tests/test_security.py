@@ -0,0 +1,50 @@
+"""Tests for password hashing and verification."""
+
+import pytest
+from passlib.hash import sha256_crypt
+
+from app.core import security
+from app.core.security import (
+    BCRYPT_MAX_PASSWORD_BYTES,
+    get_password_hash,
+    verify_password,
+)
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    """Use the minimum bcrypt cost so hashing stays quick in tests."""
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+
+
+def test_bcrypt_round_trip():
+    """A password verifies against its own hash and nothing else."""
+    hashed = get_password_hash("correct horse battery staple")
+    assert hashed.startswith("$2b$04$")
+    assert verify_password("correct horse battery staple", hashed)
+    assert not verify_password("wrong password", hashed)
+
+
+def test_passwords_are_truncated_to_bcrypt_limit():
+    """Passwords longer than 72 bytes hash and verify on their first 72 bytes."""
+    prefix = "x" * BCRYPT_MAX_PASSWORD_BYTES
+    hashed = get_password_hash(prefix + "first suffix")
+    assert verify_password(prefix + "second suffix", hashed)
+    assert verify_password(prefix, hashed)
+    assert not verify_password(prefix[:-1], hashed)
+
+
+def test_truncation_counts_bytes_not_characters():
+    """Multi-byte characters count towards the limit by their encoded size."""
+    # 24 three-byte characters fill the 72 bytes exactly
+    prefix = "€" * 24
+    hashed = get_password_hash(prefix + "tail")
+    assert verify_password(prefix, hashed)
+
+
+def test_legacy_sha256_crypt_hashes_still_verify():
+    """Hashes created before the switch to bcrypt keep working."""
+    legacy_hash = sha256_crypt.hash("old password")
+    assert legacy_hash.startswith(security.SHA256_CRYPT_PREFIX)
+    assert verify_password("old password", legacy_hash)
+    assert not verify_password("new password", legacy_hash)